@@ -1 +1,24 @@
+from typing import List, Optional
+
+from .models import Column, DataType, Diagnostic, Index, Key, Reference, Schema, Sequence, Table
+
 __version__ = '0.1'
+
+
+def load(path: str, backend: Optional[str] = None, strict: bool = True, only: Optional[List[str]] = None,
+         exclude: Optional[List[str]] = None, memory_limit: Optional[int] = None) -> Schema:
+    """
+    Parse a PDM file. The returned schema is immutable and may be shared between threads.
+
+    :param path: PDM file path. May be compressed, or ARCHIVE.zip!MEMBER.pdm. See :func:`pdmreader.source.open_pdm`
+    :param backend: XML parser backend name. See :mod:`pdmreader.backends`
+    :param strict: Raise on the first problem in the model. Otherwise collect problems into Schema.diagnostics
+    :param only: Shell-style globs of table codes. If given, only matching tables are loaded
+    :param exclude: Shell-style globs of table codes not to load
+    :param memory_limit: If given, tables are kept in a temporary file, and only recently used ones are kept in memory,
+        up to about this many bytes. See :class:`pdmreader.tablestore.TableStore`
+    """
+    from .parser import PDMParser
+    from .tablestore import TableStore
+    store = TableStore(memory_limit) if memory_limit is not None else None
+    return PDMParser(path, backend, strict, only, exclude, store).parse()
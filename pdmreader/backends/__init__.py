@@ -0,0 +1,33 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .base import Backend, ModelHandler, RawColumn, RawIndex, RawKey, RawReference, RawTable
+from .etree import ElementTreeBackend
+from .expat import ExpatBackend
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# Available backends, most preferred first.
+# expat streams without building elements and is the fastest. lxml is preferred over the stdlib ElementTree
+# when installed
+backends: Dict[str, Backend] = OrderedDict()
+backends['expat'] = ExpatBackend()
+if lxml_etree is not None:
+    backends['lxml'] = ElementTreeBackend('lxml', lxml_etree)
+backends['etree'] = ElementTreeBackend()
+
+
+def get_backend(name: Optional[str] = None) -> Backend:
+    """
+    :param name: Backend name. Use the most preferred available backend if not given
+    """
+    if not name:
+        return next(iter(backends.values()))
+
+    if name not in backends:
+        raise Exception('Unknown or unavailable parser backend: {}. Available: {}'.format(
+            name, ', '.join(backends)))
+    return backends[name]
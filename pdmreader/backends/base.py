@@ -0,0 +1,96 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Tuple
+
+# Raw model objects read by backends. All texts are stripped but otherwise kept as is,
+# interpretation (lowercasing, reference resolution, etc.) is left to the parser.
+
+
+@dataclass
+class RawColumn:
+    id: str
+    name: str = ''
+    code: str = ''
+    comment: str = ''
+    data_type: str = ''
+    length: str = ''
+    mandatory: str = ''
+
+
+@dataclass
+class RawKey:
+    id: str
+    name: str = ''
+    constraint_name: str = ''
+    column_refs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RawIndex:
+    id: str
+    name: str = ''
+    code: str = ''
+    unique: str = ''
+    linked_to_key: bool = False  # index generated for a key
+    column_refs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RawTable:
+    id: str
+    name: str = ''
+    code: str = ''
+    comment: str = ''
+    columns: List[RawColumn] = field(default_factory=list)
+    keys: List[RawKey] = field(default_factory=list)
+    primary_key_refs: List[str] = field(default_factory=list)
+    indexes: List[RawIndex] = field(default_factory=list)
+
+
+@dataclass
+class RawReference:
+    id: str
+    name: str = ''
+    code: str = ''
+    constraint_name: str = ''
+    parent_table_ref: str = ''
+    child_table_ref: str = ''
+    joins: List[Tuple[str, str]] = field(default_factory=list)  # (parent column ref, child column ref)
+
+
+class ModelHandler(ABC):
+    """
+    Receives model objects from a backend, in no particular order.
+    """
+
+    def target_model(self, name: str):
+        pass
+
+    def sequence(self, code: str):
+        pass
+
+    def accept_table(self, table_id: str, code: str) -> bool:
+        """
+        Called with the table code before the rest of the table is read. Rejected tables are skipped.
+        """
+        return True
+
+    def table(self, table: RawTable):
+        pass
+
+    def reference(self, reference: RawReference):
+        pass
+
+
+class Backend(ABC):
+    name: str
+
+    @abstractmethod
+    def parse(self, source: BinaryIO, handler: ModelHandler):
+        """
+        Read a PDM document and pass the model objects to the handler.
+
+        :param source: Binary stream of the PDM document
+        :param handler: Receiver of model objects
+        """
+        pass
@@ -0,0 +1,97 @@
+from typing import BinaryIO, List
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element
+
+from .base import Backend, ModelHandler, RawColumn, RawIndex, RawKey, RawReference, RawTable
+
+namespaces = {
+    'a': 'attribute',
+    'c': 'collection',
+    'o': 'object',
+}
+
+MODEL_PATH = 'o:RootObject/c:Children/o:Model/'
+
+
+def find_text(node: Element, path: str) -> str:
+    return node.findtext(path, '', namespaces).strip()
+
+
+def find_nodes(node: Element, path: str) -> List[Element]:
+    nodes: List[Element] = node.findall(path, namespaces)
+    return nodes or []
+
+
+def find_ref(node: Element, path: str) -> str:
+    ref_node = node.find(path, namespaces)
+    return ref_node.attrib['Ref'] if ref_node is not None else ''
+
+
+# Build the whole element tree and query it with namespace-prefixed paths.
+# Works with both xml.etree.ElementTree and the API compatible lxml.etree
+class ElementTreeBackend(Backend):
+    def __init__(self, name: str = 'etree', module=ElementTree):
+        self.name = name
+        self.module = module
+
+    def parse(self, source: BinaryIO, handler: ModelHandler):
+        root: Element = self.module.parse(source).getroot()
+
+        handler.target_model(find_text(root, MODEL_PATH + 'c:TargetModels/o:TargetModel/a:Name'))
+
+        for node in find_nodes(root, MODEL_PATH + 'c:Sequences/o:Sequence'):
+            handler.sequence(find_text(node, 'a:Code'))
+
+        for node in find_nodes(root, MODEL_PATH + 'c:Tables/o:Table'):
+            if handler.accept_table(node.attrib['Id'], find_text(node, 'a:Code')):
+                handler.table(self.read_table(node))
+
+        for node in find_nodes(root, MODEL_PATH + 'c:References/o:Reference'):
+            handler.reference(self.read_reference(node))
+
+    @staticmethod
+    def read_table(node: Element) -> RawTable:
+        table = RawTable(id=node.attrib['Id'],
+                         name=find_text(node, 'a:Name'),
+                         code=find_text(node, 'a:Code'),
+                         comment=find_text(node, 'a:Comment'))
+
+        for column_node in find_nodes(node, 'c:Columns/o:Column'):
+            table.columns.append(RawColumn(id=column_node.attrib['Id'],
+                                           name=find_text(column_node, 'a:Name'),
+                                           code=find_text(column_node, 'a:Code'),
+                                           comment=find_text(column_node, 'a:Comment'),
+                                           data_type=find_text(column_node, 'a:DataType'),
+                                           length=find_text(column_node, 'a:Length'),
+                                           mandatory=find_text(column_node, 'a:Column.Mandatory')))
+
+        for key_node in find_nodes(node, 'c:Keys/o:Key'):
+            table.keys.append(RawKey(id=key_node.attrib['Id'],
+                                     name=find_text(key_node, 'a:Name'),
+                                     constraint_name=find_text(key_node, 'a:ConstraintName'),
+                                     column_refs=[n.attrib['Ref'] for n in
+                                                  find_nodes(key_node, 'c:Key.Columns/o:Column')]))
+
+        table.primary_key_refs = [n.attrib['Ref'] for n in find_nodes(node, 'c:PrimaryKey/o:Key')]
+
+        for index_node in find_nodes(node, 'c:Indexes/o:Index'):
+            column_nodes = find_nodes(index_node, 'c:IndexColumns/o:IndexColumn/c:Column/o:Column')
+            table.indexes.append(RawIndex(id=index_node.attrib['Id'],
+                                          name=find_text(index_node, 'a:Name'),
+                                          code=find_text(index_node, 'a:Code'),
+                                          unique=find_text(index_node, 'a:Unique'),
+                                          linked_to_key=len(find_nodes(index_node, 'c:LinkedObject/o:Key')) > 0,
+                                          column_refs=[n.attrib['Ref'] for n in column_nodes]))
+
+        return table
+
+    @staticmethod
+    def read_reference(node: Element) -> RawReference:
+        return RawReference(id=node.attrib['Id'],
+                            name=find_text(node, 'a:Name'),
+                            code=find_text(node, 'a:Code'),
+                            constraint_name=find_text(node, 'a:ForeignKeyConstraintName'),
+                            parent_table_ref=find_ref(node, 'c:ParentTable/o:Table'),
+                            child_table_ref=find_ref(node, 'c:ChildTable/o:Table'),
+                            joins=[(find_ref(n, 'c:Object1/o:Column'), find_ref(n, 'c:Object2/o:Column'))
+                                   for n in find_nodes(node, 'c:Joins/o:ReferenceJoin')])
@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from xml.parsers import expat
+
+from .base import Backend, ModelHandler, RawColumn, RawIndex, RawKey, RawReference, RawTable
+
+CHUNK_SIZE = 64 * 1024
+
+namespace_prefixes = {
+    'attribute': 'a',
+    'collection': 'c',
+    'object': 'o',
+}
+
+# Path of the model element, below the document element
+MODEL_PATH = ('o:RootObject', 'c:Children', 'o:Model')
+OBJECT_DEPTH = len(MODEL_PATH) + 3
+
+# Model level collections and the kind of objects in them
+object_paths = {
+    ('c:Tables', 'o:Table'): 'table',
+    ('c:References', 'o:Reference'): 'reference',
+    ('c:Sequences', 'o:Sequence'): 'sequence',
+    ('c:TargetModels', 'o:TargetModel'): 'target_model',
+}
+
+# (object kind, path relative to the object) -> (object or child object, attribute to store the text)
+text_fields: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, str]] = {
+    ('table', ('a:Name',)): ('object', 'name'),
+    ('table', ('a:Code',)): ('object', 'code'),
+    ('table', ('a:Comment',)): ('object', 'comment'),
+    ('table', ('c:Columns', 'o:Column', 'a:Name')): ('child', 'name'),
+    ('table', ('c:Columns', 'o:Column', 'a:Code')): ('child', 'code'),
+    ('table', ('c:Columns', 'o:Column', 'a:Comment')): ('child', 'comment'),
+    ('table', ('c:Columns', 'o:Column', 'a:DataType')): ('child', 'data_type'),
+    ('table', ('c:Columns', 'o:Column', 'a:Length')): ('child', 'length'),
+    ('table', ('c:Columns', 'o:Column', 'a:Column.Mandatory')): ('child', 'mandatory'),
+    ('table', ('c:Keys', 'o:Key', 'a:Name')): ('child', 'name'),
+    ('table', ('c:Keys', 'o:Key', 'a:ConstraintName')): ('child', 'constraint_name'),
+    ('table', ('c:Indexes', 'o:Index', 'a:Name')): ('child', 'name'),
+    ('table', ('c:Indexes', 'o:Index', 'a:Code')): ('child', 'code'),
+    ('table', ('c:Indexes', 'o:Index', 'a:Unique')): ('child', 'unique'),
+    ('reference', ('a:Name',)): ('object', 'name'),
+    ('reference', ('a:Code',)): ('object', 'code'),
+    ('reference', ('a:ForeignKeyConstraintName',)): ('object', 'constraint_name'),
+    ('sequence', ('a:Code',)): ('object', 'code'),
+    ('target_model', ('a:Name',)): ('object', 'name'),
+}
+
+
+# Collect only the needed fields from parser events, without building elements.
+class _ModelReader:
+    def __init__(self, handler: ModelHandler):
+        self.handler = handler
+        self.tags: Dict[str, str] = {}
+        self.stack: List[str] = []
+        self.kind: Optional[str] = None  # kind of the model level object being read
+        self.object = None
+        self.child = None
+        self.text: Optional[List[str]] = None
+        self.text_field: Optional[Tuple[str, str]] = None
+        self.skipping = False  # table rejected by the handler, ignore the rest of it
+
+    def tag(self, name: str) -> str:
+        # "attribute Name" -> "a:Name"
+        tag = self.tags.get(name)
+        if tag is None:
+            uri, _, local = name.rpartition(' ')
+            prefix = namespace_prefixes.get(uri)
+            tag = prefix + ':' + local if prefix else local
+            self.tags[name] = tag
+        return tag
+
+    def start(self, name: str, attrs: Dict[str, str]):
+        stack = self.stack
+        stack.append(self.tag(name))
+
+        if self.kind is None:
+            if len(stack) == OBJECT_DEPTH and tuple(stack[1:OBJECT_DEPTH - 2]) == MODEL_PATH:
+                kind = object_paths.get((stack[-2], stack[-1]))
+                if kind:
+                    self.start_object(kind, attrs)
+            return
+
+        if self.skipping:
+            return
+
+        path = tuple(stack[OBJECT_DEPTH:])
+        text_field = text_fields.get((self.kind, path))
+        if text_field:
+            self.text = []
+            self.text_field = text_field
+        elif self.kind == 'table':
+            self.start_table_child(path, attrs)
+        elif self.kind == 'reference':
+            self.start_reference_child(path, attrs)
+
+    def end(self, name: str):
+        if self.text is not None:
+            target, attribute = self.text_field
+            setattr(self.object if target == 'object' else self.child, attribute, ''.join(self.text).strip())
+            self.text = None
+            if self.kind == 'table' and self.text_field == ('object', 'code'):
+                if not self.handler.accept_table(self.object.id, self.object.code):
+                    self.skipping = True
+                    self.object.columns, self.object.keys, self.object.indexes = [], [], []
+        elif self.kind is not None and len(self.stack) == OBJECT_DEPTH:
+            self.end_object()
+        self.stack.pop()
+
+    def data(self, data: str):
+        if self.text is not None:
+            self.text.append(data)
+
+    def start_object(self, kind: str, attrs: Dict[str, str]):
+        self.kind = kind
+        if kind == 'table':
+            self.object = RawTable(id=attrs['Id'])
+        elif kind == 'reference':
+            self.object = RawReference(id=attrs['Id'])
+        else:
+            self.object = SimpleNamespace(code='', name='')
+
+    def end_object(self):
+        kind = self.kind
+        if self.skipping:
+            self.skipping = False
+        elif kind == 'table':
+            self.handler.table(self.object)
+        elif kind == 'reference':
+            self.object.joins = [(parent, child) for parent, child in self.object.joins]
+            self.handler.reference(self.object)
+        elif kind == 'sequence':
+            self.handler.sequence(self.object.code)
+        elif kind == 'target_model':
+            self.handler.target_model(self.object.name)
+        self.kind = None
+        self.object = None
+        self.child = None
+
+    def start_table_child(self, path: Tuple[str, ...], attrs: Dict[str, str]):
+        table: RawTable = self.object
+        if path == ('c:Columns', 'o:Column'):
+            self.child = RawColumn(id=attrs['Id'])
+            table.columns.append(self.child)
+        elif path == ('c:Keys', 'o:Key'):
+            self.child = RawKey(id=attrs['Id'])
+            table.keys.append(self.child)
+        elif path == ('c:Keys', 'o:Key', 'c:Key.Columns', 'o:Column'):
+            self.child.column_refs.append(attrs['Ref'])
+        elif path == ('c:PrimaryKey', 'o:Key'):
+            table.primary_key_refs.append(attrs['Ref'])
+        elif path == ('c:Indexes', 'o:Index'):
+            self.child = RawIndex(id=attrs['Id'])
+            table.indexes.append(self.child)
+        elif path == ('c:Indexes', 'o:Index', 'c:LinkedObject', 'o:Key'):
+            self.child.linked_to_key = True
+        elif path == ('c:Indexes', 'o:Index', 'c:IndexColumns', 'o:IndexColumn', 'c:Column', 'o:Column'):
+            self.child.column_refs.append(attrs['Ref'])
+
+    def start_reference_child(self, path: Tuple[str, ...], attrs: Dict[str, str]):
+        reference: RawReference = self.object
+        if path == ('c:ParentTable', 'o:Table'):
+            reference.parent_table_ref = reference.parent_table_ref or attrs['Ref']
+        elif path == ('c:ChildTable', 'o:Table'):
+            reference.child_table_ref = reference.child_table_ref or attrs['Ref']
+        elif path == ('c:Joins', 'o:ReferenceJoin'):
+            self.child = ['', '']
+            reference.joins.append(self.child)
+        elif path == ('c:Joins', 'o:ReferenceJoin', 'c:Object1', 'o:Column'):
+            self.child[0] = self.child[0] or attrs['Ref']
+        elif path == ('c:Joins', 'o:ReferenceJoin', 'c:Object2', 'o:Column'):
+            self.child[1] = self.child[1] or attrs['Ref']
+
+
+# Stream the document through expat, keeping only the fields pdmreader uses
+class ExpatBackend(Backend):
+    name = 'expat'
+
+    def parse(self, source: BinaryIO, handler: ModelHandler):
+        reader = _ModelReader(handler)
+        parser = expat.ParserCreate(namespace_separator=' ')
+        parser.buffer_text = True
+        parser.StartElementHandler = reader.start
+        parser.EndElementHandler = reader.end
+        parser.CharacterDataHandler = reader.data
+
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.Parse(chunk, False)
+        parser.Parse(b'', True)
@@ -0,0 +1,175 @@
+import fnmatch
+import re
+from array import array
+from itertools import compress
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .models import Column, Schema, Table
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Stored for missing length/precision/scale
+NONE = -1
+
+
+class ColumnStore:
+    """
+    Columnar view of all columns of a schema, for whole-schema filtering and aggregation.
+
+    Each column attribute is kept in a flat array, indexed by row. Strings are interned and stored as ids.
+    Filters and group-bys run over the arrays, with NumPy if available, and map back to Column objects only for
+    the final result rows.
+    """
+
+    def __init__(self, schema: Schema):
+        self.tables: Sequence[Table] = schema.tables
+        self.codes: List[str] = []  # code id -> column code
+        self.types: List[str] = []  # type id -> data type
+        code_ids: Dict[str, int] = {}
+        type_ids: Dict[str, int] = {}
+
+        table_index = array('l')
+        position = array('l')  # position in Table.columns
+        code_id = array('l')
+        type_id = array('l')
+        length = array('l')
+        precision = array('l')
+        scale = array('l')
+        required = array('b')
+        has_comment = array('b')
+
+        for i, table in enumerate(self.tables):
+            for j, column in enumerate(table.columns):
+                data_type = column.data_type
+                type_str = str(data_type)
+                if column.code not in code_ids:
+                    code_ids[column.code] = len(self.codes)
+                    self.codes.append(column.code)
+                if type_str not in type_ids:
+                    type_ids[type_str] = len(self.types)
+                    self.types.append(type_str)
+
+                table_index.append(i)
+                position.append(j)
+                code_id.append(code_ids[column.code])
+                type_id.append(type_ids[type_str])
+                length.append(self.to_int(data_type.length))
+                precision.append(self.to_int(data_type.precision))
+                scale.append(self.to_int(data_type.scale))
+                required.append(1 if column.required else 0)
+                has_comment.append(1 if column.comment else 0)
+
+        self.size = len(table_index)
+        self.arrays = {
+            'table_index': table_index,
+            'position': position,
+            'code': code_id,
+            'type': type_id,
+            'length': length,
+            'precision': precision,
+            'scale': scale,
+            'required': required,
+            'has_comment': has_comment,
+        }
+        if numpy is not None:
+            # Zero copy views of the arrays
+            self.arrays = {name: numpy.frombuffer(a, dtype=numpy.dtype(a.typecode)) if len(a) else
+                           numpy.zeros(0, dtype=numpy.dtype(a.typecode)) for name, a in self.arrays.items()}
+
+    @staticmethod
+    def of(schema: Schema) -> 'ColumnStore':
+        """
+        :return: Column store of the schema, built on first use and cached on the schema
+        """
+        if 'column_store' not in schema.cache:
+            schema.cache['column_store'] = ColumnStore(schema)
+        return schema.cache['column_store']
+
+    @staticmethod
+    def to_int(value) -> int:
+        return int(value) if value is not None and value != '' else NONE
+
+    def select(self, code: Optional[str] = None, data_type: Optional[str] = None, required: Optional[bool] = None,
+               has_comment: Optional[bool] = None) -> Sequence[int]:
+        """
+        Find rows matching all given conditions.
+
+        :param code: Shell-style glob of column codes
+        :param data_type: Shell-style glob of data types
+        :param required: Required flag
+        :param has_comment: Whether the column has a comment
+        :return: Matching row numbers
+        """
+        masks = []
+        if code is not None:
+            masks.append(self.mask_in('code', self.matching_ids(self.codes, code)))
+        if data_type is not None:
+            masks.append(self.mask_in('type', self.matching_ids(self.types, data_type)))
+        if required is not None:
+            masks.append(self.mask_flag('required', required))
+        if has_comment is not None:
+            masks.append(self.mask_flag('has_comment', has_comment))
+
+        if numpy is not None:
+            mask = numpy.ones(self.size, dtype=bool)
+            for m in masks:
+                mask &= m
+            return numpy.flatnonzero(mask).tolist()
+
+        if not masks:
+            return list(range(self.size))
+        return list(compress(range(self.size), map(all, zip(*masks))))
+
+    def group_count(self, attribute: str, rows: Optional[Sequence[int]] = None) -> List[Tuple[str, int]]:
+        """
+        Count rows by code or data type.
+
+        :param attribute: 'code' or 'type'
+        :param rows: Rows to count. Default all rows
+        :return: (value, count), most frequent first
+        """
+        values = self.codes if attribute == 'code' else self.types
+        ids = self.arrays[attribute]
+        if numpy is not None:
+            if rows is not None:
+                ids = ids[numpy.asarray(rows, dtype=numpy.int64)]
+            counts = numpy.bincount(ids, minlength=len(values)).tolist()
+        else:
+            counts = [0] * len(values)
+            for i in (ids if rows is None else (ids[r] for r in rows)):
+                counts[i] += 1
+
+        result = [(values[i], count) for i, count in enumerate(counts) if count > 0]
+        result.sort(key=lambda r: (-r[1], r[0]))
+        return result
+
+    def rows(self, rows: Sequence[int]) -> List[Tuple[Table, Column]]:
+        table_index = self.arrays['table_index']
+        position = self.arrays['position']
+        result = []
+        for r in rows:
+            table = self.tables[int(table_index[r])]
+            result.append((table, table.columns[int(position[r])]))
+        return result
+
+    @staticmethod
+    def matching_ids(values: List[str], glob: str) -> Set[int]:
+        # Match against distinct values only
+        pattern = re.compile(fnmatch.translate(glob), re.IGNORECASE)
+        return {i for i, value in enumerate(values) if pattern.match(value)}
+
+    def mask_in(self, attribute: str, ids: Set[int]):
+        values = self.arrays[attribute]
+        if numpy is not None:
+            return numpy.isin(values, numpy.fromiter(ids, dtype=values.dtype, count=len(ids)))
+        return [v in ids for v in values]
+
+    def mask_flag(self, attribute: str, flag: bool):
+        values = self.arrays[attribute]
+        if numpy is not None:
+            return values == (1 if flag else 0)
+        expected = 1 if flag else 0
+        return [v == expected for v in values]
@@ -1,28 +1,129 @@
+import argparse
+import contextlib
+import dataclasses
 import fnmatch
+import json
+import os
 import re
+import shlex
+import sys
 from typing import List, Optional
-import datetime
 
+from .columnstore import ColumnStore
+from .emitter import MultiTargetEmitter, output_names, targets
+from .export import COLUMN_HEADERS, DictionaryExporter, column_fields, formats
+from .image import write_image
+from .javagen import JavaGenerator
+from .lint import Linter, ORACLE_MAX_IDENTIFIER_LENGTH
+from .loader import BackgroundLoader, LoadError
+from .metrics import Metrics, PHASES, UNKNOWN_COMMAND
 from .models import Column, Table, Sequence, Schema
-from .typemapping import TypeMapping
+from .renderer import Renderer
+from .typemapping import LOSSY, UNMAPPED
+from .suggest import sequence_suggestions, table_suggestions
+from .typestats import type_conversions, type_usage
 from .unicode_formatter import UnicodeFormatter
 
 
+# Used in place of metrics phases when metrics are disabled
+no_phase = contextlib.nullcontext()
+
+
 class CommandExecutor:
     whitespace_pattern = re.compile(r'\s+')
 
-    def __init__(self, schema: Schema, interactive: bool = True):
-        self.schema = schema
+    # Commands, and the kind of argument they take. Used for tab completion
+    command_arguments = {
+        'help': None,
+        'exit': None,
+        't': None,
+        'tables': 'table',
+        'seq': 'sequence',
+        'table': 'table',
+        'mysql': 'table',
+        'oracle': 'table',
+        'java': 'table',
+        'deps': 'table',
+        'rdeps': 'table',
+        'javagen': 'table',
+        'lint': None,
+        'typestats': None,
+        'emit': None,
+        'columns': None,
+        'image': None,
+        'export': None,
+        'timing': None,
+    }
+
+    # Commands whose arguments are split shell-style, so option values may be quoted
+    option_commands = ('javagen', 'lint', 'emit', 'columns', 'image', 'export')
+
+    def __init__(self, schema: Optional[Schema], interactive: bool = True, metrics: Optional[Metrics] = None,
+                 loader: Optional[BackgroundLoader] = None):
+        """
+        :param schema: Schema. None if it is being loaded by the loader
+        :param metrics: If given, latency and output size of commands are recorded into it
+        :param loader: Loader of the schema, if not loaded yet. Commands needing only tables parsed so far are
+            answered at once, others wait for the schema
+        """
+        self.loaded_schema = schema
+        self.loader = loader
+        self.load_failed = False  # loading failed, and the error was reported
         self.formatter = UnicodeFormatter()
         self.horizontal_output = True
-
-        if interactive:
-            print('DB: {}'.format(self.schema.db))
-            print('Tables: {}'.format(len(self.schema.tables)))
-            print('Sequences: {}'.format(len(self.schema.sequences)))
+        self.metrics = metrics
+
+        # With a loader, the summary is printed by the caller once loaded
+        if interactive and loader is None:
+            self.print_summary()
+
+    @property
+    def schema(self) -> Schema:
+        if self.loaded_schema is None:
+            self.loaded_schema = self.loader.wait()
+        return self.loaded_schema
+
+    @property
+    def loading(self) -> bool:
+        return self.loaded_schema is None and self.loader.loading
+
+    def print_summary(self):
+        print('DB: {}'.format(self.schema.db))
+        print('Tables: {}'.format(len(self.schema.tables)))
+        print('Sequences: {}'.format(len(self.schema.sequences)))
+        errors = sum(1 for d in self.schema.diagnostics if d.severity == 'error')
+        if errors:
+            print('Problems: {} errors, broken parts skipped. Run lint to show them'.format(errors))
 
     def command(self, command: str):
         command = self.collapse_whitespace(command)
+        try:
+            if self.metrics is None:
+                self.dispatch(command)
+            else:
+                name = command.split(' ', 1)[0]
+                # Typos and unknown commands share one entry, instead of adding one each
+                self.metrics.measure(name if name in self.command_arguments else UNKNOWN_COMMAND, self.dispatch,
+                                     command)
+        except LoadError as e:
+            print(e, file=sys.stderr)
+            self.load_failed = True
+
+    def phase(self, name: str):
+        """
+        Context manager measuring a phase of the running command, see :class:`pdmreader.metrics.Metrics`.
+        """
+        return self.metrics.phase(name) if self.metrics is not None else no_phase
+
+    def dispatch(self, command: str):
+        arguments: List[str] = []
+        if command.split(' ', 1)[0] in self.option_commands:
+            try:
+                arguments = shlex.split(command)[1:]
+            except ValueError as e:
+                print('Invalid arguments: {}'.format(e))
+                return
+
         if command == 'help':
             self.print_help()
         elif command == 'exit':
@@ -45,6 +146,28 @@ class CommandExecutor:
             self.print_table_ddl('oracle', command.split()[1])
         elif command.startswith('java '):
             self.print_table_ddl('java', command.split()[1])
+        elif command.startswith('javagen '):
+            self.generate_java(arguments)
+        elif command == 'lint' or command.startswith('lint '):
+            self.lint(arguments)
+        elif command == 'typestats':
+            self.print_type_stats()
+        elif command.startswith('typestats '):
+            self.print_type_stats(command.split()[1])
+        elif command.startswith('emit '):
+            self.emit(arguments)
+        elif command == 'columns' or command.startswith('columns '):
+            self.print_columns(arguments)
+        elif command.startswith('image '):
+            self.save_image(arguments)
+        elif command.startswith('export '):
+            self.export(arguments)
+        elif command == 'timing':
+            self.print_timing()
+        elif command.startswith('deps '):
+            self.print_dependencies(command.split()[1])
+        elif command.startswith('rdeps '):
+            self.print_dependencies(command.split()[1], reverse=True)
         else:
             print('Unknown command')
 
@@ -56,19 +179,57 @@ class CommandExecutor:
             print('Vertical output on')
 
     def print_tables(self, glob: str = None):
+        if self.loading:
+            self.print_loaded_tables(glob)
+            return
+
+        if glob:
+            tables = self.find_tables(glob)
+            if tables is None:
+                return
+        else:
+            tables = self.schema.tables
+
+        self.print_table_list(tables)
+
+    def print_loaded_tables(self, glob: str = None):
+        # Tables parsed so far, while the model is being loaded
+        tables = self.loader.tables()
         if glob:
             try:
                 pattern = re.compile(fnmatch.translate(glob), re.IGNORECASE)
             except re.error:
                 print('Invalid glob: ' + glob)
                 return
-            tables = [t for t in self.schema.tables if pattern.match(t.code)]
-            if len(tables) <= 0:
-                print('No matching table')
-                return
-        else:
-            tables = self.schema.tables
+            tables = [t for t in tables if pattern.match(t.code)]
+
+        self.print_table_list(tables)
+        print('Still loading ({}), more tables may follow'.format(self.loader.progress()))
+
+    def find_tables(self, glob: str) -> Optional[List[Table]]:
+        try:
+            with self.phase('lookup'):
+                tables = self.schema.find_tables(glob)
+        except re.error:
+            print('Invalid glob: ' + glob)
+            return None
+        if len(tables) <= 0:
+            print('No matching table')
+            return None
+        return tables
+
+    def print_table_not_found(self, table_name: str):
+        print('Table not found: ' + table_name)
+        with self.phase('lookup'):
+            suggestions = table_suggestions(self.schema, table_name)
+        self.print_suggestions(suggestions)
 
+    @staticmethod
+    def print_suggestions(suggestions: List[str]):
+        if suggestions:
+            print('Did you mean: {}?'.format(', '.join(suggestions)))
+
+    def print_table_list(self, tables: List[Table]):
         format_spec = '{:30s}{:40s}{:50s}'
 
         def print_table(t: Table):
@@ -85,9 +246,10 @@ class CommandExecutor:
                 print(self.formatter.format('{:30s}{:40s}{:50s}', 'Code', 'Name', 'Comment'))
                 print('-' * 80)
 
-        print_header()
-        for table in tables:
-            print_table(table)
+        with self.phase('render'):
+            print_header()
+            for table in tables:
+                print_table(table)
 
         print('Count: {}'.format(len(tables)))
 
@@ -96,189 +258,386 @@ class CommandExecutor:
             print('No table specified')
             return
 
-        table = next((t for t in self.schema.tables if t.code.lower() == table_name.lower()), None)
+        with self.phase('lookup'):
+            # Columns are known as soon as the table is parsed
+            table = self.loader.wait_for_table(table_name) if self.loading else self.schema.get_table(table_name)
         if not table:
-            print('Table not found: ' + table_name)
+            self.print_table_not_found(table_name)
             return
 
         format_spec = '{:30}{:20}{:10}{:30}{}'
 
         def print_column(c: Column):
             if self.horizontal_output:
-                print(self.formatter.format(format_spec, c.code, str(c.data_type), 'True' if c.required else 'False',
-                                            c.name,
-                                            c.comment))
+                print(self.formatter.format(format_spec, *column_fields(c)))
             else:
-                print('Code: {}'.format(c.code))
-                print('Type: {}'.format(str(c.data_type)))
-                print('Required: {}'.format('True' if c.required else 'False'))
-                print('Name: {}'.format(c.name))
-                print('Comment: {}'.format(c.comment))
+                for header, value in zip(COLUMN_HEADERS, column_fields(c)):
+                    print('{}: {}'.format(header, value))
                 print()
 
         def print_header():
             if self.horizontal_output:
-                print(self.formatter.format(format_spec, 'Code', 'Type', 'Required', 'Name', 'Comment'))
+                print(self.formatter.format(format_spec, *COLUMN_HEADERS))
                 print('-' * 100)
 
-        print_header()
-        for column in table.columns:
-            print_column(column)
+        with self.phase('render'):
+            print_header()
+            for column in table.columns:
+                print_column(column)
+
+    def print_columns(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='columns', add_help=False)
+        parser.add_argument('--code')
+        parser.add_argument('--type')
+        parser.add_argument('--required', action='store_const', const=True)
+        parser.add_argument('--optional', action='store_const', const=False, dest='required')
+        parser.add_argument('--no-comment', action='store_const', const=False, dest='has_comment')
+        parser.add_argument('--group', choices=['code', 'type'])
+        parser.add_argument('--min-count', type=int, default=1)
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
+
+        with self.phase('lookup'):
+            store = ColumnStore.of(self.schema)
+            rows = store.select(options.code, options.type, options.required, options.has_comment)
+
+        if options.group:
+            groups = [g for g in store.group_count(options.group, rows) if g[1] >= options.min_count]
+            format_spec = '{:40}{:>10}'
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, options.group.capitalize(), 'Count'))
+                print('-' * 50)
+            for value, count in groups:
+                if self.horizontal_output:
+                    print(self.formatter.format(format_spec, value, str(count)))
+                else:
+                    print('{}: {}'.format(options.group.capitalize(), value))
+                    print('Count: {}'.format(count))
+                    print()
+            print('Count: {}'.format(len(groups)))
+            return
+
+        format_spec = '{:30}{:30}{:20}{:10}{:30}{}'
+        if self.horizontal_output:
+            print(self.formatter.format(format_spec, 'Table', 'Code', 'Type', 'Required', 'Name', 'Comment'))
+            print('-' * 130)
+        for table, c in store.rows(rows):
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, table.code, c.code, str(c.data_type),
+                                            'True' if c.required else 'False', c.name, c.comment))
+            else:
+                print('Table: {}'.format(table.code))
+                print('Code: {}'.format(c.code))
+                print('Type: {}'.format(str(c.data_type)))
+                print('Required: {}'.format('True' if c.required else 'False'))
+                print('Name: {}'.format(c.name))
+                print('Comment: {}'.format(c.comment))
+                print()
+        print('Count: {}'.format(len(rows)))
 
     def print_table_ddl(self, db: str, table_name: str):
         if not table_name:
             print('No table specified')
             return
 
-        table = next((t for t in self.schema.tables if t.code.lower() == table_name.lower()), None)
+        if db != 'java' and self.is_glob(table_name):
+            self.print_tables_ddl(db, table_name)
+            return
+
+        with self.phase('lookup'):
+            # Single table DDL has no foreign key constraints, so it does not wait for the whole model
+            table = self.loader.wait_for_table(table_name) if self.loading else self.schema.get_table(table_name)
         if not table:
-            print('Table not found: ' + table_name)
+            self.print_table_not_found(table_name)
             return
 
-        if db == 'mysql':
-            self.print_table_ddl_mysql(table, self.schema.db)
-        elif db == 'oracle':
-            self.print_table_ddl_oracle(table, self.schema.db)
-        elif db == 'java':
-            self.print_table_ddl_java(table, self.schema.db)
+        self.print_ddl(db, table)
 
-    @staticmethod
-    def print_table_ddl_mysql(table: Table, source_db: str):
-        result = ''
-        result += 'CREATE TABLE `{}` (\n'.format(table.code)
-        for column in table.columns:
-            result += '  `{}` {}'.format(column.code, TypeMapping.convert(source_db, 'mysql', str(column.data_type)))
-            if column.required:
-                result += ' NOT NULL'
-            if column.name:
-                result += " COMMENT '{}'".format(column.name)
-            result += ',\n'
+    def print_tables_ddl(self, db: str, glob: str):
+        tables = self.find_tables(glob)
+        if tables is None:
+            return
 
-        if table.primary_key:
-            result += '  PRIMARY KEY ({}),\n'.format(CommandExecutor.quote_columns(table.primary_key.columns, '`'))
+        with self.phase('lookup'):
+            tables, cycle = self.schema.sort_by_dependencies(tables)
+        if cycle:
+            print('-- Dependency cycle detected: {}'.format(' -> '.join(cycle)))
+            print('-- Tables on or depending on the cycle are generated last, in alphabetical order')
+            print()
 
-        for key in table.keys:
-            result += '  UNIQUE KEY `{}`({}),\n'.format(key.code, CommandExecutor.quote_columns(key.columns, '`'))
+        for table in tables:
+            self.print_ddl(db, table, foreign_keys=True)
+            print()
+
+    def print_dependencies(self, table_name: str, reverse: bool = False):
+        with self.phase('lookup'):
+            table = self.schema.get_table(table_name)
+            if table:
+                graph = self.schema.dependents if reverse else self.schema.dependencies
+                tables = [self.schema.get_table(code) for code in graph[table.code]]
+        if not table:
+            self.print_table_not_found(table_name)
+            return
 
-        for index in table.indexes:
-            result += '  {}KEY `{}`({}),\n'.format('UNIQUE ' if index.unique else '', index.code,
-                                                   CommandExecutor.quote_columns(index.columns, '`'))
+        self.print_table_list(tables)
+
+    def print_ddl(self, db: str, table: Table, foreign_keys: bool = False):
+        """
+        :param db: mysql/oracle/java
+        :param foreign_keys: Whether to include foreign key constraints, see Schema.render_ddl
+        """
+        with self.phase('type_mapping'):
+            # While loading, the database type is known before the whole model
+            source_db = self.loader.wait_for_database_type() if self.loading else self.schema.db
+            column_types = Renderer.column_types(table, source_db, db)
+
+        with self.phase('render'):
+            if db == 'mysql':
+                text = Renderer.render_mysql(table, column_types, foreign_keys)
+            elif db == 'oracle':
+                text = Renderer.render_oracle(table, column_types, foreign_keys)
+            else:
+                text = Renderer.render_java(table, column_types)
+        print(text)
+
+    def generate_java(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='javagen', add_help=False)
+        parser.add_argument('--package', required=True)
+        parser.add_argument('--out', required=True)
+        parser.add_argument('--jobs', type=int)
+        parser.add_argument('pattern', nargs='?')
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
 
-        result = result.rstrip(',\n') + '\n)'
+        if options.pattern:
+            tables = self.find_tables(options.pattern)
+            if tables is None:
+                return
+        else:
+            tables = self.schema.tables
 
-        if table.name:
-            result += " COMMENT '{}'".format(table.name)
-        result += ';'
+        generator = JavaGenerator(self.schema, options.package, options.out, options.jobs)
+        try:
+            written, unchanged = generator.generate(tables)
+        except OSError as e:
+            print('Cannot generate: {}'.format(e), file=sys.stderr)
+            return
+        print('Written: {}, unchanged: {}'.format(written, unchanged))
+
+    def emit(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='emit', add_help=False)
+        parser.add_argument('--out', required=True)
+        parser.add_argument('--package', default='com.example')
+        parser.add_argument('targets')
+        parser.add_argument('pattern', nargs='?')
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
 
-        print(result)
+        selected_targets = [t for t in options.targets.split(',') if t]
+        unknown_targets = [t for t in selected_targets if t not in targets]
+        if unknown_targets or not selected_targets:
+            print('Unknown target: ' + ', '.join(unknown_targets))
+            return
 
-    @staticmethod
-    def print_table_ddl_oracle(table: Table, source_db: str):
-        result = ''
-        result += 'CREATE TABLE "{}" (\n'.format(table.code)
-        for column in table.columns:
-            result += '  "{}" {}'.format(column.code, TypeMapping.convert(source_db, 'oracle', str(column.data_type)))
-            if column.required:
-                result += ' NOT NULL'
-            result += ',\n'
-
-        if table.primary_key:
-            result += '  CONSTRAINT "{}" PRIMARY KEY ({}),\n'.format(
-                table.primary_key.code,
-                CommandExecutor.quote_columns(table.primary_key.columns, '"'))
-
-        if len(table.keys) > 0:
-            for key in table.keys:
-                result += '  CONSTRAINT "{}" UNIQUE ({}),\n'.format(key.code,
-                                                                    CommandExecutor.quote_columns(key.columns, '"'))
-
-        result = result.rstrip(',\n') + '\n);\n\n'
-
-        if table.name:
-            result += 'COMMENT ON TABLE "{}" IS \'{}\';\n'.format(table.code, table.name)
-        for c in table.columns:
-            if c.name:
-                result += 'COMMENT ON COLUMN "{}"."{}" IS \'{}\';\n'.format(table.code, c.code, c.name)
-
-        if len(table.indexes) > 0:
-            for index in table.indexes:
-                result += 'CREATE {}INDEX "{}" ON "{}"({});\n'.format(
-                    'UNIQUE ' if index.unique else '',
-                    index.code,
-                    table.code,
-                    CommandExecutor.quote_columns(index.columns, '"'))
-
-        result = result.rstrip()
-        print(result)
+        if options.pattern:
+            tables = self.find_tables(options.pattern)
+            if tables is None:
+                return
+        else:
+            tables = self.schema.tables
 
-    @staticmethod
-    def print_table_ddl_java(table: Table, source_db: str):
-        def upper_camel_case(word: str):
-            return ''.join(x.capitalize() or '_' for x in word.split('_'))
-
-        def camel_case(word: str):
-            word = upper_camel_case(word)
-            return word[0].lower() + word[1:]
-
-        # Only support primary key with only one column
-        primary_key_column: Optional[str] = None
-        if table.primary_key and len(table.primary_key.columns) == 1:
-            primary_key_column = table.primary_key.columns[0].name
-
-        result = ''
-        package_str = 'package com.example;'
-        imports = {'lombok.Data', 'javax.persistence.Table', 'java.io.Serializable'}
-
-        today = datetime.date.today().isoformat()
-        result += '/**\n'
-        if table.name:
-            result += ' * {}\n *\n'.format(table.name)
-        result += ' * @since {}\n'.format(today)
-        result += ' */\n'
-
-        # Use Lombok annotations
-        result += '@Data\n'
-        result += '@Table(name = "{}")\n'.format(table.code)
-        result += 'public class {} implements Serializable {{\n'.format(upper_camel_case(table.code))
-        result += '  private static final long serialVersionUID = 1L;\n\n'
-
-        for c in table.columns:
-            if c.name:
-                result += '  /** {} */\n'.format(c.name)
-            if primary_key_column == c.name:
-                imports.add('javax.persistence.Id')
-                result += '  @Id\n'
-            java_type = TypeMapping.convert(source_db, 'java', str(c.data_type))
-            if java_type == 'Date':
-                imports.add('java.util.Date')
-            result += '  private {} {};\n'.format(java_type, camel_case(c.code))
-
-        result += '}'
-        result = result.rstrip()
-
-        imports_list = list(imports)
-        imports_list.sort()
-        normal_imports = [p for p in imports_list if not p.startswith('java.') and not p.startswith('javax.')]
-        java_imports = [p for p in imports_list if p.startswith('java.')]
-        javax_imports = [p for p in imports_list if p.startswith('javax.')]
-        imports_str = '\n'.join(['import ' + p + ';' for p in normal_imports]) + '\n\n' + \
-                      '\n'.join(['import ' + p + ';' for p in javax_imports]) + '\n' + \
-                      '\n'.join(['import ' + p + ';' for p in java_imports])
-
-        result = package_str + '\n\n' + imports_str + '\n\n' + result
-
-        print(result)
+        outputs = {}
+        java_dir = options.out if 'java' in selected_targets else None
+        try:
+            os.makedirs(options.out, exist_ok=True)
+            for t in selected_targets:
+                if t in output_names:
+                    outputs[t] = open(os.path.join(options.out, output_names[t]), 'w', encoding='utf-8')
+            emitter = MultiTargetEmitter(self.schema, outputs, java_dir, options.package)
+            java_paths = emitter.emit(tables)
+        except OSError as e:
+            print('Cannot emit: {}'.format(e), file=sys.stderr)
+            return
+        finally:
+            for output in outputs.values():
+                output.close()
+
+        for output in outputs.values():
+            print('Written: {}'.format(output.name))
+        if java_dir:
+            print('Written: {} Java files into {}'.format(len(java_paths), emitter.java_package_dir))
+
+    def save_image(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='image', add_help=False)
+        parser.add_argument('--out', required=True)
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
+
+        try:
+            write_image(self.schema, options.out)
+        except OSError as e:
+            print('Cannot write image: {}'.format(e), file=sys.stderr)
+            return
+        print('Written: {}'.format(options.out))
+
+    def export(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='export', add_help=False)
+        parser.add_argument('--out', required=True)
+        parser.add_argument('--split', action='store_true')
+        parser.add_argument('--jobs', type=int)
+        parser.add_argument('format', choices=formats)
+        parser.add_argument('pattern', nargs='?')
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
+
+        if options.pattern:
+            tables = self.find_tables(options.pattern)
+            if tables is None:
+                return
+        else:
+            tables = self.schema.tables
+
+        exporter = DictionaryExporter(self.schema, options.format, options.jobs)
+        try:
+            if options.split:
+                paths = exporter.export_split(tables, options.out)
+                print('Written: {} ({} tables)'.format(paths[0], len(paths) - 1))
+            else:
+                exporter.export(tables, options.out)
+                print('Written: {}'.format(options.out))
+        except OSError as e:
+            print('Cannot export: {}'.format(e), file=sys.stderr)
+
+    def lint(self, args: List[str]):
+        parser = argparse.ArgumentParser(prog='lint', add_help=False)
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument('--max-length', type=int, default=ORACLE_MAX_IDENTIFIER_LENGTH)
+        try:
+            options = parser.parse_args(args)
+        except SystemExit:
+            return
+
+        diagnostics = Linter(self.schema, options.max_length).lint()
+        if options.json:
+            print(json.dumps([dataclasses.asdict(d) for d in diagnostics], ensure_ascii=False, indent=2))
+            return
+
+        format_spec = '{:10}{:30}{:30}{}'
+        if self.horizontal_output:
+            print(self.formatter.format(format_spec, 'Severity', 'Check', 'Table', 'Message'))
+            print('-' * 100)
+        for d in diagnostics:
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, d.severity, d.check, d.table, d.message))
+            else:
+                print('Severity: {}'.format(d.severity))
+                print('Check: {}'.format(d.check))
+                print('Table: {}'.format(d.table))
+                print('Message: {}'.format(d.message))
+                print()
+
+        errors = sum(1 for d in diagnostics if d.severity == 'error')
+        print('Errors: {}, warnings: {}'.format(errors, len(diagnostics) - errors))
+
+    def print_type_stats(self, target_db: str = None):
+        if target_db and target_db not in ('mysql', 'oracle', 'java'):
+            print('Unknown target: ' + target_db)
+            return
+
+        if not target_db:
+            format_spec = '{:30}{:>10}  {}'
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, 'Type', 'Count', 'Examples'))
+                print('-' * 100)
+            for usage in type_usage(self.schema):
+                examples = ', '.join(usage.examples)
+                if self.horizontal_output:
+                    print(self.formatter.format(format_spec, usage.data_type, str(usage.count), examples))
+                else:
+                    print('Type: {}'.format(usage.data_type))
+                    print('Count: {}'.format(usage.count))
+                    print('Examples: {}'.format(examples))
+                    print()
+            print('Types: {}'.format(len(type_usage(self.schema))))
+            return
+
+        format_spec = '{:30}{:>10}  {:30}{:10}{}'
+        if self.horizontal_output:
+            print(self.formatter.format(format_spec, 'Type', 'Count', 'Target type', 'Status', 'Examples'))
+            print('-' * 120)
+        with self.phase('type_mapping'):
+            conversions = type_conversions(self.schema, target_db)
+        for conversion in conversions:
+            usage = conversion.usage
+            examples = ', '.join(usage.examples)
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, usage.data_type, str(usage.count), conversion.target_type,
+                                            conversion.status, examples))
+            else:
+                print('Type: {}'.format(usage.data_type))
+                print('Count: {}'.format(usage.count))
+                print('Target type: {}'.format(conversion.target_type))
+                print('Status: {}'.format(conversion.status))
+                print('Examples: {}'.format(examples))
+                print()
+
+        def count_columns(status: str):
+            return sum(c.usage.count for c in conversions if c.status == status)
+
+        print('Types: {}, lossy columns: {}, unmapped columns: {}'.format(
+            len(conversions), count_columns(LOSSY), count_columns(UNMAPPED)))
+
+    def print_timing(self):
+        if self.metrics is None:
+            print('Timing is off. Start with --metrics or --metrics-out FILE')
+            return
+
+        format_spec = '{:30}{:>10}{:>12}{:>12}{:>12}{:>12}'
+        if self.horizontal_output:
+            print(self.formatter.format(format_spec, 'Command', 'Count', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)',
+                                        'p95 output'))
+            print('-' * 100)
+
+        def print_row(name: str, count: int, histogram, output: str, phase: bool = False):
+            values = ['{:.3f}'.format(histogram.percentile(p)) for p in (50, 95, 99)]
+            if self.horizontal_output:
+                print(self.formatter.format(format_spec, '  ' + name if phase else name, str(count), *values, output))
+            else:
+                print('{}: {}'.format('Phase' if phase else 'Command', name))
+                print('Count: {}'.format(count))
+                print('p50/p95/p99 (ms): {}'.format('/'.join(values)))
+                if output:
+                    print('p95 output: {}'.format(output))
+                print()
+
+        for name, metrics in sorted(self.metrics.commands.items()):
+            count = metrics.latency.count
+            print_row(name, count, metrics.latency, '{:.0f}'.format(metrics.output_size.percentile(95)))
+            for phase in PHASES:
+                if metrics.phases[phase].max > 0:
+                    print_row(phase, count, metrics.phases[phase], '', phase=True)
 
     def print_sequences(self, glob: str = None):
         if glob:
             try:
-                pattern = re.compile(fnmatch.translate(glob), re.IGNORECASE)
+                sequences = self.schema.find_sequences(glob)
             except re.error:
                 print('Invalid glob: ' + glob)
                 return
-            sequences = [s for s in self.schema.sequences if pattern.match(s.code)]
             if len(sequences) <= 0:
                 print('No matching sequences')
+                if not self.is_glob(glob):
+                    self.print_suggestions(sequence_suggestions(self.schema, glob))
                 return
         else:
             sequences = self.schema.sequences
@@ -315,19 +674,37 @@ class CommandExecutor:
         print_help_item('seq', 'Show sequences')
         print_help_item('seq PATTERN', 'Show sequences matching the given shell-style glob')
         print_help_item('table TABLE', 'Show definitions of the given table')
+        print_help_item('columns [OPTIONS]', 'Search columns of all tables. Options: --code PATTERN, --type PATTERN,')
+        print_help_item('', '--required, --optional, --no-comment, --group code|type, --min-count N')
         print_help_item('mysql TABLE', 'Generate MySQL DDL for creating the given table')
         print_help_item('oracle TABLE', 'Generate Oracle DDL for creating the given table')
+        print_help_item('mysql PATTERN', 'Generate MySQL DDL with foreign keys for matching tables, referenced tables'
+                                         ' first')
+        print_help_item('oracle PATTERN', 'Generate Oracle DDL with foreign keys for matching tables, referenced tables'
+                                          ' first')
         print_help_item('java TABLE', 'Generate Java entity definition for the given table')
+        print_help_item('javagen --package PKG --out DIR [PATTERN]', '')
+        print_help_item('', 'Generate Java entity files for matching tables into source directory DIR')
+        print_help_item('emit TARGETS [PATTERN] --out DIR [--package PKG]', '')
+        print_help_item('', 'Generate mysql,oracle,java outputs for matching tables at once into DIR, Java')
+        print_help_item('', 'entities one file per table in the package directory below DIR')
+        print_help_item('export FORMAT [PATTERN] --out PATH [--split] [--jobs N]', '')
+        print_help_item('', 'Export a markdown/html data dictionary of matching tables into file PATH, or with')
+        print_help_item('', '--split, into one file per table and index file in directory PATH')
+        print_help_item('image --out FILE', 'Write a binary schema image for sharing with other processes')
+        print_help_item('lint [--json] [--max-length N]', 'Check the whole model and report all problems found')
+        print_help_item('typestats', 'Show data types used and their column counts')
+        print_help_item('typestats TARGET', 'Show conversion of used data types to mysql/oracle/java, marking lossy or'
+                                            ' unmapped ones')
+        print_help_item('deps TABLE', 'Show tables referenced by the given table')
+        print_help_item('rdeps TABLE', 'Show tables referencing the given table')
+        print_help_item('timing', 'Show p50/p95/p99 latency of commands run so far. Needs --metrics')
         print_help_item('exit, Ctrl + D', 'Exit')
 
     @staticmethod
-    def collapse_whitespace(s) -> str:
-        return CommandExecutor.whitespace_pattern.sub(' ', s)
+    def is_glob(s: str) -> bool:
+        return any(c in s for c in '*?[')
 
     @staticmethod
-    def quote_columns(columns: List[Column], quote: str):
-        if len(columns) == 0:
-            return ''
-        else:
-            result = '`' + '`, `'.join([c.code for c in columns]) + '`'
-            return result.replace('`', quote)
+    def collapse_whitespace(s) -> str:
+        return CommandExecutor.whitespace_pattern.sub(' ', s)
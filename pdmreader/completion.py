@@ -0,0 +1,71 @@
+import readline
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from .models import Schema
+
+
+class Completer:
+    """
+    Tab completion for command names, and table or sequence codes as command arguments.
+
+    Codes are kept in sorted arrays built once, so completing a prefix is a binary search plus the matches.
+    Matching is case insensitive, like table lookup in commands.
+    """
+
+    def __init__(self, schema: Optional[Schema], command_arguments: Dict[str, Optional[str]]):
+        """
+        :param schema: Schema to complete codes from. If None, only command names are completed until
+            :meth:`set_schema` is called
+        :param command_arguments: Command names, and the kind of argument they take: 'table', 'sequence' or None
+        """
+        self.command_arguments = command_arguments
+        self.commands = sorted(command_arguments)
+        self.codes: Dict[str, List[str]] = {'table': [], 'sequence': []}
+        self.has_schema = False
+        self.matches: List[str] = []
+        if schema is not None:
+            self.set_schema(schema)
+
+    def set_schema(self, schema: Schema):
+        self.codes = {
+            'table': sorted({code.lower() for code, _ in schema.table_names()}),
+            'sequence': sorted({s.code.lower() for s in schema.sequences}),
+        }
+        self.has_schema = True
+
+    def install(self):
+        readline.set_completer(self.complete)
+        readline.set_completer_delims(' \t')
+        if 'libedit' in (readline.__doc__ or ''):
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_begidx()]
+            self.matches = self.candidates(line, text)
+        return self.matches[state] if state < len(self.matches) else None
+
+    def candidates(self, line: str, text: str) -> List[str]:
+        """
+        :param line: Input before the word being completed
+        :param text: The word being completed
+        """
+        words = line.split()
+        if len(words) == 0:
+            return self.find_prefix(self.commands, text)
+        if len(words) > 1:
+            return []
+
+        kind = self.command_arguments.get(words[0])
+        if not kind:
+            return []
+        return self.find_prefix(self.codes[kind], text.lower())
+
+    @staticmethod
+    def find_prefix(words: List[str], prefix: str) -> List[str]:
+        start = bisect_left(words, prefix)
+        end = bisect_left(words, prefix + '\U0010ffff', start)
+        return words[start:end]
@@ -0,0 +1,90 @@
+import datetime
+import os
+from typing import Dict, List, Optional, TextIO
+
+from .models import Schema, Table
+from .renderer import Renderer
+from .typemapping import TypeMapping
+
+targets = ('mysql', 'oracle', 'java')
+
+# Output file name of each DDL target. Java entities are written one file per table, like javagen does
+output_names = {
+    'mysql': 'mysql.sql',
+    'oracle': 'oracle.sql',
+}
+
+
+class MultiTargetEmitter:
+    """
+    Generate MySQL DDL, Oracle DDL and Java entities in one traversal of the tables.
+
+    Each table is visited once. Column types are formatted once per column and converted once per distinct type
+    for all targets together, then the rendered fragments are written to the output stream of each DDL target, and
+    to the Java file of the table.
+    """
+
+    def __init__(self, schema: Schema, outputs: Dict[str, TextIO], java_dir: Optional[str] = None,
+                 java_package: str = 'com.example', since: Optional[str] = None):
+        """
+        :param schema: Schema of the tables
+        :param outputs: Output stream of each DDL target (mysql/oracle)
+        :param java_dir: If given, Java entities are generated too, one file per table in the package directory
+            below this source root directory
+        :param java_package: Java package of the entities
+        :param since: Value of the @since tag of Java entities. Default today
+        """
+        self.schema = schema
+        self.outputs = outputs
+        self.java_package = java_package
+        self.java_package_dir = os.path.join(java_dir, *java_package.split('.')) if java_dir else None
+        self.since = since or datetime.date.today().isoformat()
+        self.targets = list(outputs) + (['java'] if java_dir else [])
+        # data type -> converted type of each target
+        self.type_cache: Dict[str, Dict[str, str]] = {}
+
+    def emit(self, tables: List[Table]) -> List[str]:
+        """
+        :param tables: Tables to emit. They are emitted in dependency order, see Schema.sort_by_dependencies
+        :return: Paths of the Java files written
+        """
+        tables, cycle = self.schema.sort_by_dependencies(tables)
+        if cycle:
+            for output in self.outputs.values():
+                output.write('-- Dependency cycle detected: {}\n\n'.format(' -> '.join(cycle)))
+
+        java_paths: List[str] = []
+        if self.java_package_dir:
+            os.makedirs(self.java_package_dir, exist_ok=True)
+        for table in tables:
+            column_types = self.column_types(table)
+            for target, output in self.outputs.items():
+                output.write(self.render(target, table, column_types[target]))
+                output.write('\n\n')
+            if self.java_package_dir:
+                path = os.path.join(self.java_package_dir, Renderer.upper_camel_case(table.code) + '.java')
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(self.render('java', table, column_types['java']) + '\n')
+                java_paths.append(path)
+        return java_paths
+
+    def column_types(self, table: Table) -> Dict[str, List[str]]:
+        result: Dict[str, List[str]] = {target: [] for target in self.targets}
+        for column in table.columns:
+            data_type = str(column.data_type)
+            converted = self.type_cache.get(data_type)
+            if converted is None:
+                converted = {target: TypeMapping.convert(self.schema.db, target, data_type) for target in self.targets}
+                self.type_cache[data_type] = converted
+            for target, column_types in result.items():
+                column_types.append(converted[target])
+        return result
+
+    def render(self, target: str, table: Table, column_types: List[str]) -> str:
+        if target == 'mysql':
+            return Renderer.render_mysql(table, column_types, foreign_keys=True)
+        elif target == 'oracle':
+            return Renderer.render_oracle(table, column_types, foreign_keys=True)
+        elif target == 'java':
+            return Renderer.render_java(table, column_types, self.java_package, self.since)
+        raise Exception('Unknown target: ' + target)
@@ -0,0 +1,240 @@
+import html
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence as SequenceType, TextIO, Tuple
+
+from .models import Column, Key, Schema, Table
+
+formats = ('markdown', 'html')
+
+# File extension of each format
+extensions = {
+    'markdown': '.md',
+    'html': '.html',
+}
+
+# Table of contents file, in split mode
+INDEX_NAME = 'index'
+
+# Columns of a table, as shown by the table command
+COLUMN_HEADERS = ('Code', 'Type', 'Required', 'Name', 'Comment')
+
+# Tables rendered per task, and tasks in flight per worker, when rendering in parallel
+CHUNK_SIZE = 64
+TASKS_PER_WORKER = 2
+
+
+def column_fields(column: Column) -> Tuple[str, ...]:
+    """
+    :return: Values of the column for :data:`COLUMN_HEADERS`
+    """
+    return column.code, str(column.data_type), 'True' if column.required else 'False', column.name, column.comment
+
+
+def key_columns(key: Key) -> str:
+    return ', '.join(c.code for c in key.columns)
+
+
+class MarkdownRenderer:
+    extension = extensions['markdown']
+
+    @staticmethod
+    def cell(text: str) -> str:
+        return text.replace('\\', '\\\\').replace('|', '\\|').replace('<', '&lt;').replace('\r', '') \
+            .replace('\n', '<br>')
+
+    @staticmethod
+    def row(values: SequenceType[str]) -> str:
+        return '| ' + ' | '.join(MarkdownRenderer.cell(v) for v in values) + ' |\n'
+
+    @staticmethod
+    def grid(headers: SequenceType[str], rows: List[SequenceType[str]]) -> str:
+        return MarkdownRenderer.row(headers) + '|' + ' --- |' * len(headers) + '\n' + \
+            ''.join(MarkdownRenderer.row(r) for r in rows)
+
+    @staticmethod
+    def header(title: str) -> str:
+        return '# {}\n\n'.format(MarkdownRenderer.cell(title))
+
+    @staticmethod
+    def contents(tables: List[Table], link_format: str) -> str:
+        rows = [('[{}]({})'.format(MarkdownRenderer.cell(t.code), link_format.format(code=t.code)), t.name, t.comment)
+                for t in tables]
+        return '## Tables\n\n' + MarkdownRenderer.grid(('Code', 'Name', 'Comment'), rows) + '\n'
+
+    @staticmethod
+    def footer() -> str:
+        return ''
+
+    @staticmethod
+    def table(table: Table) -> str:
+        result = '<a id="{}"></a>\n\n## {}\n\n'.format(html.escape(table.code), MarkdownRenderer.cell(table.code))
+        if table.name:
+            result += '{}\n\n'.format(MarkdownRenderer.cell(table.name))
+        if table.comment:
+            result += '{}\n\n'.format(MarkdownRenderer.cell(table.comment))
+
+        result += MarkdownRenderer.grid(COLUMN_HEADERS, [column_fields(c) for c in table.columns]) + '\n'
+
+        keys = [('Primary', k.code, key_columns(k)) for k in filter(None, [table.primary_key])]
+        keys += [('Unique', k.code, key_columns(k)) for k in table.keys]
+        if keys:
+            result += '### Keys\n\n' + MarkdownRenderer.grid(('Kind', 'Code', 'Columns'), keys) + '\n'
+
+        if table.indexes:
+            indexes = [(i.code, 'True' if i.unique else 'False', key_columns(i)) for i in table.indexes]
+            result += '### Indexes\n\n' + MarkdownRenderer.grid(('Code', 'Unique', 'Columns'), indexes) + '\n'
+        return result
+
+
+class HtmlRenderer:
+    extension = extensions['html']
+
+    @staticmethod
+    def grid(headers: SequenceType[str], rows: List[SequenceType[str]], escaped: bool = False) -> str:
+        """
+        :param escaped: Whether the values are HTML already
+        """
+        cell = (lambda v: v) if escaped else html.escape
+        result = '<table>\n<tr>' + ''.join('<th>{}</th>'.format(html.escape(h)) for h in headers) + '</tr>\n'
+        for row in rows:
+            result += '<tr>' + ''.join('<td>{}</td>'.format(cell(v)) for v in row) + '</tr>\n'
+        return result + '</table>\n'
+
+    @staticmethod
+    def header(title: str) -> str:
+        return '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{0}</title>\n</head>\n<body>\n' \
+               '<h1>{0}</h1>\n'.format(html.escape(title))
+
+    @staticmethod
+    def contents(tables: List[Table], link_format: str) -> str:
+        rows = [('<a href="{}">{}</a>'.format(html.escape(link_format.format(code=t.code)), html.escape(t.code)),
+                 html.escape(t.name), html.escape(t.comment)) for t in tables]
+        return '<h2>Tables</h2>\n' + HtmlRenderer.grid(('Code', 'Name', 'Comment'), rows, escaped=True)
+
+    @staticmethod
+    def footer() -> str:
+        return '</body>\n</html>\n'
+
+    @staticmethod
+    def table(table: Table) -> str:
+        result = '<h2 id="{0}">{0}</h2>\n'.format(html.escape(table.code))
+        if table.name:
+            result += '<p>{}</p>\n'.format(html.escape(table.name))
+        if table.comment:
+            result += '<p>{}</p>\n'.format(html.escape(table.comment))
+
+        result += HtmlRenderer.grid(COLUMN_HEADERS, [column_fields(c) for c in table.columns])
+
+        keys = [('Primary', k.code, key_columns(k)) for k in filter(None, [table.primary_key])]
+        keys += [('Unique', k.code, key_columns(k)) for k in table.keys]
+        if keys:
+            result += '<h3>Keys</h3>\n' + HtmlRenderer.grid(('Kind', 'Code', 'Columns'), keys)
+
+        if table.indexes:
+            indexes = [(i.code, 'True' if i.unique else 'False', key_columns(i)) for i in table.indexes]
+            result += '<h3>Indexes</h3>\n' + HtmlRenderer.grid(('Code', 'Unique', 'Columns'), indexes)
+        return result
+
+
+renderers = {
+    'markdown': MarkdownRenderer,
+    'html': HtmlRenderer,
+}
+
+# Worker state, set once per worker process
+_exporter: Optional['DictionaryExporter'] = None
+
+
+def _init_worker(exporter: 'DictionaryExporter'):
+    global _exporter
+    _exporter = exporter
+
+
+def _render_in_worker(codes: List[str]) -> List[str]:
+    return [_exporter.renderer.table(_exporter.schema.get_table(code)) for code in codes]
+
+
+class DictionaryExporter:
+    """
+    Export a data dictionary of tables: a table of contents, and the columns, keys and indexes of each table.
+
+    Pages are written as they are rendered, so only a bounded number of rendered tables is held in memory,
+    whatever the number of tables.
+    """
+
+    def __init__(self, schema: Schema, output_format: str, jobs: Optional[int] = None):
+        """
+        :param output_format: markdown/html
+        :param jobs: Number of worker processes rendering tables. Default number of CPUs
+        """
+        self.schema = schema
+        self.renderer = renderers[output_format]
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def render_tables(self, tables: List[Table]) -> Iterator[str]:
+        """
+        :return: Rendered tables, in the order of the tables
+        """
+        if self.jobs <= 1 or len(tables) < 2 * CHUNK_SIZE:
+            return (self.renderer.table(table) for table in tables)
+        return self.render_in_parallel([t.code for t in tables])
+
+    def render_in_parallel(self, codes: List[str]) -> Iterator[str]:
+        # Unlike executor.map, submit tasks only as results are consumed, so that rendered tables waiting to be
+        # written do not pile up
+        chunks = (codes[i:i + CHUNK_SIZE] for i in range(0, len(codes), CHUNK_SIZE))
+        with ProcessPoolExecutor(self.jobs, initializer=_init_worker, initargs=(self,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_render_in_worker, chunk))
+                if len(pending) >= self.jobs * TASKS_PER_WORKER:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def export(self, tables: List[Table], path: str, title: str = 'Data dictionary'):
+        """
+        Write the dictionary into one file, tables linked from the table of contents by anchor. The directory of the
+        file is created if needed.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            self.write_page(f, title, tables, '#{code}')
+
+    def export_split(self, tables: List[Table], out_dir: str, title: str = 'Data dictionary') -> List[str]:
+        """
+        Write one file per table into a directory, and the table of contents into an index file.
+
+        :return: Paths of the files written, the index first
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        extension = self.renderer.extension
+        index_path = os.path.join(out_dir, INDEX_NAME + extension)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            self.write_page(f, title, tables, '{code}' + extension, with_tables=False)
+
+        paths = [index_path]
+        for table, content in zip(tables, self.render_tables(tables)):
+            path = os.path.join(out_dir, table.code + extension)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.renderer.header(table.code))
+                f.write(content)
+                f.write(self.renderer.footer())
+            paths.append(path)
+        return paths
+
+    def write_page(self, output: TextIO, title: str, tables: List[Table], link_format: str, with_tables=True):
+        """
+        :param link_format: Link to a table, formatted with its code
+        :param with_tables: Whether to write the tables after the table of contents
+        """
+        output.write(self.renderer.header(title))
+        output.write(self.renderer.contents(tables, link_format))
+        if with_tables:
+            for content in self.render_tables(tables):
+                output.write(content)
+        output.write(self.renderer.footer())
@@ -0,0 +1,385 @@
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from . import source
+from .backends import backends
+from .models import Column, Key, Schema, Table
+from .parser import PDMParser
+from .unicode_formatter import UnicodeFormatter
+
+# History store, in the current directory by default
+DEFAULT_PATH = '.pdmreader-history.sqlite'
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+schema_sql = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    file TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+-- Tables and columns of the last version ingested, to compute the deltas of the next one
+CREATE TABLE IF NOT EXISTS table_state (
+    table_code TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    part_hashes TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS column_state (
+    table_code TEXT NOT NULL,
+    column_code TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (table_code, column_code)
+);
+-- Deltas: a row per version in which a table or column was added, changed or removed
+CREATE TABLE IF NOT EXISTS table_changes (
+    version_id INTEGER NOT NULL,
+    table_code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    parts TEXT NOT NULL,
+    name TEXT,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS table_changes_table ON table_changes (table_code, version_id);
+CREATE TABLE IF NOT EXISTS column_changes (
+    version_id INTEGER NOT NULL,
+    table_code TEXT NOT NULL,
+    column_code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data_type TEXT,
+    required INTEGER,
+    name TEXT,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS column_changes_column ON column_changes (table_code, column_code, version_id);
+"""
+
+
+class HistoryError(Exception):
+    pass
+
+
+class VersionExistsError(HistoryError):
+    pass
+
+
+class VersionOrderError(HistoryError):
+    """
+    The version seems older than the last version ingested. Deltas are taken against the last version ingested, so
+    they would be recorded reversed.
+    """
+
+
+@dataclass
+class TableChange:
+    version: str
+    status: str  # ADDED/CHANGED/REMOVED
+    parts: List[str]  # changed parts of the table, see table_parts
+    name: Optional[str]
+    comment: Optional[str]
+    columns: List[Tuple[str, str]]  # (column code, status) of the columns changed in the version
+
+
+@dataclass
+class ColumnChange:
+    version: str
+    status: str  # ADDED/CHANGED/REMOVED
+    data_type: Optional[str]  # None if removed, and so are the following
+    required: Optional[bool]
+    name: Optional[str]
+    comment: Optional[str]
+
+
+def content_hash(value) -> str:
+    content = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def column_values(column: Column) -> list:
+    return [str(column.data_type), column.required, column.name, column.comment]
+
+
+def key_values(key: Optional[Key]) -> Optional[list]:
+    return [key.code, [c.code for c in key.columns]] if key else None
+
+
+def version_key(version: str) -> Optional[tuple]:
+    """
+    :return: Key sorting version names naturally, such as 1.9 before 1.10. None if the name has no number to compare
+    """
+    parts = re.split(r'(\d+)', version.lower())
+    if len(parts) == 1:
+        return None
+    return tuple((0, int(part), '') if i % 2 else (1, 0, part) for i, part in enumerate(parts))
+
+
+def table_parts(table: Table) -> Dict[str, str]:
+    """
+    :return: Content hash of each part of the table. Columns are hashed in order, so reordering them is a change
+    """
+    return {
+        'name': content_hash(table.name),
+        'comment': content_hash(table.comment),
+        'columns': content_hash([[c.code] + column_values(c) for c in table.columns]),
+        'primary key': content_hash(key_values(table.primary_key)),
+        'keys': content_hash([key_values(k) for k in table.keys]),
+        'indexes': content_hash([[i.code, i.unique, [c.code for c in i.columns]] for i in table.indexes]),
+        'references': content_hash([[r.code, r.parent_table, [c.code for c in r.parent_columns],
+                                     [c.code for c in r.child_columns]] for r in table.references]),
+    }
+
+
+class HistoryStore:
+    """
+    Versions of a model, stored as deltas in a SQLite file.
+
+    Each version ingested records only the tables and columns added, changed or removed since the version ingested
+    before it, found by comparing content hashes. Unchanged tables are skipped by their hash alone. The history of a
+    table or column is then read from an index, without parsing any model.
+
+    Versions must therefore be ingested oldest first. Ingesting an older version after a newer one would record its
+    changes reversed, so it is refused when version names tell, see :meth:`check_version`.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(schema_sql)
+
+    def close(self):
+        self.connection.close()
+
+    def ingest(self, version: str, schema: Schema, file: str = '', force: bool = False) -> Tuple[int, int]:
+        """
+        Record a version, as the successor of the last one ingested.
+
+        :param force: Record the version even if its name sorts before the last version ingested
+        :return: Number of tables and columns added, changed or removed
+        :raise VersionExistsError: If the version is already ingested
+        :raise VersionOrderError: If the version name sorts before the last version ingested, unless forced
+        """
+        db = self.connection
+        self.check_version(version, force)
+
+        table_state: Dict[str, Tuple[str, Dict[str, str]]] = {
+            code: (table_hash, json.loads(part_hashes))
+            for code, table_hash, part_hashes in db.execute('SELECT table_code, hash, part_hashes FROM table_state')}
+
+        with db:
+            version_id = db.execute('INSERT INTO versions (name, file, ingested_at) VALUES (?, ?, ?)',
+                                    (version, file, datetime.datetime.now().isoformat(timespec='seconds'))).lastrowid
+            table_changes = []
+            column_changes = []
+
+            for table in schema.tables:
+                parts = table_parts(table)
+                table_hash = content_hash(parts)
+                previous = table_state.pop(table.code, None)
+                if previous and previous[0] == table_hash:
+                    continue
+
+                if previous:
+                    status = CHANGED
+                    changed_parts = [part for part, part_hash in parts.items() if previous[1].get(part) != part_hash]
+                else:
+                    status = ADDED
+                    changed_parts = []
+                table_changes.append((version_id, table.code, status, ', '.join(changed_parts), table.name,
+                                      table.comment))
+                db.execute('INSERT OR REPLACE INTO table_state (table_code, hash, part_hashes) VALUES (?, ?, ?)',
+                           (table.code, table_hash, json.dumps(parts)))
+                if previous and 'columns' not in changed_parts:
+                    continue
+
+                column_state = dict(db.execute('SELECT column_code, hash FROM column_state WHERE table_code = ?',
+                                               (table.code,)))
+                for column in table.columns:
+                    values = column_values(column)
+                    column_hash = content_hash(values)
+                    previous_hash = column_state.pop(column.code, None)
+                    if previous_hash == column_hash:
+                        continue
+                    column_changes.append((version_id, table.code, column.code,
+                                           CHANGED if previous_hash else ADDED, *values))
+                    db.execute('INSERT OR REPLACE INTO column_state (table_code, column_code, hash) VALUES (?, ?, ?)',
+                               (table.code, column.code, column_hash))
+                for column_code in column_state:
+                    column_changes.append((version_id, table.code, column_code, REMOVED, None, None, None, None))
+                    db.execute('DELETE FROM column_state WHERE table_code = ? AND column_code = ?',
+                               (table.code, column_code))
+
+            # Tables left over are not in this version
+            for code in table_state:
+                table_changes.append((version_id, code, REMOVED, '', None, None))
+                for column_code, in db.execute('SELECT column_code FROM column_state WHERE table_code = ?', (code,)):
+                    column_changes.append((version_id, code, column_code, REMOVED, None, None, None, None))
+                db.execute('DELETE FROM column_state WHERE table_code = ?', (code,))
+                db.execute('DELETE FROM table_state WHERE table_code = ?', (code,))
+
+            db.executemany('INSERT INTO table_changes VALUES (?, ?, ?, ?, ?, ?)', table_changes)
+            db.executemany('INSERT INTO column_changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', column_changes)
+
+        return len(table_changes), len(column_changes)
+
+    def has_version(self, version: str) -> bool:
+        return self.connection.execute('SELECT 1 FROM versions WHERE name = ?', (version,)).fetchone() is not None
+
+    def check_version(self, version: str, force: bool = False):
+        """
+        Check that the version can be ingested next. Versions are compared by the numbers in their names, such as
+        release numbers or dates. Names without numbers are taken in the order given.
+
+        :param force: Skip the order check
+        :raise VersionExistsError: If the version is already ingested
+        :raise VersionOrderError: If the version name sorts before the last version ingested, unless forced
+        """
+        if self.has_version(version):
+            raise VersionExistsError('Version already ingested: ' + version)
+        last = self.connection.execute('SELECT name FROM versions ORDER BY id DESC LIMIT 1').fetchone()
+        if force or last is None:
+            return
+        key, last_key = version_key(version), version_key(last[0])
+        if key is not None and last_key is not None and key < last_key:
+            raise VersionOrderError('Version {} sorts before the last version ingested, {}. Versions must be '
+                                    'ingested oldest first'.format(version, last[0]))
+
+    def versions(self) -> List[Tuple[str, str, str]]:
+        """
+        :return: (version, file, ingestion time) of all versions, in order of ingestion
+        """
+        return self.connection.execute('SELECT name, file, ingested_at FROM versions ORDER BY id').fetchall()
+
+    def table_history(self, table_code: str) -> List[TableChange]:
+        table_code = table_code.lower()
+        columns: Dict[str, List[Tuple[str, str]]] = {}
+        for version, column_code, status in self.connection.execute(
+                'SELECT v.name, c.column_code, c.status FROM column_changes c JOIN versions v ON v.id = c.version_id '
+                'WHERE c.table_code = ? ORDER BY c.version_id, c.rowid', (table_code,)):
+            columns.setdefault(version, []).append((column_code, status))
+
+        return [TableChange(version, status, parts.split(', ') if parts else [], name, comment,
+                            columns.get(version, []))
+                for version, status, parts, name, comment in self.connection.execute(
+                    'SELECT v.name, t.status, t.parts, t.name, t.comment FROM table_changes t '
+                    'JOIN versions v ON v.id = t.version_id WHERE t.table_code = ? ORDER BY t.version_id',
+                    (table_code,))]
+
+    def column_history(self, table_code: str, column_code: str) -> List[ColumnChange]:
+        return [ColumnChange(version, status, data_type, None if required is None else bool(required), name, comment)
+                for version, status, data_type, required, name, comment in self.connection.execute(
+                    'SELECT v.name, c.status, c.data_type, c.required, c.name, c.comment FROM column_changes c '
+                    'JOIN versions v ON v.id = c.version_id WHERE c.table_code = ? AND c.column_code = ? '
+                    'ORDER BY c.version_id', (table_code.lower(), column_code.lower()))]
+
+
+def print_versions(store: HistoryStore, formatter: UnicodeFormatter):
+    format_spec = '{:30}{:25}{}'
+    print(formatter.format(format_spec, 'Version', 'Ingested at', 'File'))
+    print('-' * 100)
+    versions = store.versions()
+    for name, file, ingested_at in versions:
+        print(formatter.format(format_spec, name, ingested_at, file))
+    print('Count: {}'.format(len(versions)))
+
+
+def print_table_history(store: HistoryStore, formatter: UnicodeFormatter, table_code: str):
+    changes = store.table_history(table_code)
+    if not changes:
+        print('No history of table: ' + table_code)
+        return
+
+    format_spec = '{:20}{:10}{}'
+    print(formatter.format(format_spec, 'Version', 'Status', 'Changes'))
+    print('-' * 100)
+    for change in changes:
+        details = []
+        if change.parts:
+            details.append(', '.join(change.parts))
+        for status in (ADDED, CHANGED, REMOVED):
+            codes = [code for code, column_status in change.columns if column_status == status]
+            if codes and change.status == CHANGED:
+                details.append('{} columns: {}'.format(status, ', '.join(codes)))
+        if change.status == ADDED:
+            details.append('{} columns'.format(len(change.columns)))
+        print(formatter.format(format_spec, change.version, change.status, '; '.join(details)))
+
+
+def print_column_history(store: HistoryStore, formatter: UnicodeFormatter, column: str):
+    table_code, _, column_code = column.partition('.')
+    if not column_code:
+        print('Column must be given as TABLE.COLUMN')
+        return
+    changes = store.column_history(table_code, column_code)
+    if not changes:
+        print('No history of column: ' + column)
+        return
+
+    format_spec = '{:20}{:10}{:20}{:10}{:30}{}'
+    print(formatter.format(format_spec, 'Version', 'Status', 'Type', 'Required', 'Name', 'Comment'))
+    print('-' * 120)
+    for change in changes:
+        if change.status == REMOVED:
+            print(formatter.format(format_spec, change.version, change.status, '', '', '', ''))
+        else:
+            print(formatter.format(format_spec, change.version, change.status, change.data_type,
+                                   'True' if change.required else 'False', change.name, change.comment))
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(prog='pdmreader history',
+                                     description='Record versions of a model, and show what changed when')
+    parser.add_argument('--db', default=DEFAULT_PATH, metavar='FILE',
+                        help='History store. Default: {} in the current directory'.format(DEFAULT_PATH))
+    subparsers = parser.add_subparsers(dest='action', metavar='ACTION')
+    subparsers.required = True
+    ingest = subparsers.add_parser(
+        'ingest', help='Record a version of the model, after the versions recorded so far',
+        description='Record a version of the model. Changes are taken against the last version ingested, so versions '
+                    'must be ingested oldest first. A version whose name sorts before the last one, comparing the '
+                    'numbers in names, is refused unless --force is given')
+    ingest.add_argument('version', help='Version name, such as a release number')
+    ingest.add_argument('--force', action='store_true',
+                        help='Record the version even if its name sorts before the last version ingested')
+    ingest.add_argument('file', help='PDM file. May be compressed (gzip/bzip2/xz), or ARCHIVE.zip!MEMBER.pdm')
+    ingest.add_argument('--backend', choices=list(backends),
+                        help='XML parser backend. Default: {}'.format(next(iter(backends))))
+    subparsers.add_parser('versions', help='Show versions recorded')
+    table = subparsers.add_parser('table', help='Show versions in which the table changed')
+    table.add_argument('table')
+    column = subparsers.add_parser('column', help='Show versions in which the column changed')
+    column.add_argument('column', metavar='TABLE.COLUMN')
+    args = parser.parse_args(argv)
+
+    if args.action == 'ingest' and not source.exists(args.file):
+        print("File not found: " + args.file, file=sys.stderr)
+        return
+
+    store = HistoryStore(args.db)
+    formatter = UnicodeFormatter()
+    try:
+        if args.action == 'ingest':
+            try:
+                # Before parsing, which takes long
+                store.check_version(args.version, args.force)
+                schema = PDMParser(args.file, args.backend).parse()
+                tables, columns = store.ingest(args.version, schema, args.file, args.force)
+            except (FileNotFoundError, source.SourceError, HistoryError) as e:
+                print(e, file=sys.stderr)
+                return
+            print('Ingested {}: {} tables and {} columns changed'.format(args.version, tables, columns))
+        elif args.action == 'versions':
+            print_versions(store, formatter)
+        elif args.action == 'table':
+            print_table_history(store, formatter, args.table)
+        elif args.action == 'column':
+            print_column_history(store, formatter, args.column)
+    finally:
+        store.close()
@@ -0,0 +1,421 @@
+import mmap
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from .models import DataType, Schema
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+MAGIC = b'PDMI'
+VERSION = 1
+
+# Stored for missing strings, numbers and records
+NONE = 0xFFFFFFFF
+
+# Section order in the header. Each section is stored as (offset, count)
+SECTIONS = ('string_offsets', 'string_data', 'tables', 'columns', 'keys', 'indexes', 'references', 'column_refs',
+            'sequences', 'table_order')
+
+header_struct = struct.Struct('<4sHHI' + 'II' * len(SECTIONS))
+uint_struct = struct.Struct('<I')
+# id, name, code, comment, first column, column count, first key, key count, primary key, first index, index count,
+# first reference, reference count
+table_struct = struct.Struct('<13I')
+# id, name, code, comment, type name, length, precision, scale, required
+column_struct = struct.Struct('<9I')
+# id, code, name, first column ref, column ref count
+key_struct = struct.Struct('<5I')
+# id, code, name, unique, first column ref, column ref count
+index_struct = struct.Struct('<6I')
+# id, code, name, parent table, child table, first parent column ref, parent column ref count, first child column ref,
+# child column ref count
+reference_struct = struct.Struct('<9I')
+
+
+class _ImageWriter:
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.strings: List[bytes] = []
+        self.string_ids: Dict[str, int] = {}
+        self.tables = bytearray()
+        self.columns = bytearray()
+        self.keys = bytearray()
+        self.indexes = bytearray()
+        self.references = bytearray()
+        self.column_refs = bytearray()
+        self.sequences = bytearray()
+        self.column_count = 0
+        self.key_count = 0
+        self.index_count = 0
+        self.reference_count = 0
+        self.column_ref_count = 0
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value.encode('utf-8'))
+        return string_id
+
+    @staticmethod
+    def number(value) -> int:
+        return NONE if value is None else int(value)
+
+    def write_column_refs(self, column_ids: List[int]) -> int:
+        start = self.column_ref_count
+        for column_id in column_ids:
+            self.column_refs += uint_struct.pack(column_id)
+        self.column_ref_count += len(column_ids)
+        return start
+
+    def write_key(self, key, column_index: Dict[str, int]) -> int:
+        refs = [column_index[c.id] for c in key.columns]
+        start = self.write_column_refs(refs)
+        self.keys += key_struct.pack(self.string(key.id), self.string(key.code), self.string(key.name), start,
+                                     len(refs))
+        self.key_count += 1
+        return self.key_count - 1
+
+    def build(self) -> bytes:
+        schema = self.schema
+        table_index = {t.code: i for i, t in enumerate(schema.tables)}
+        # Columns are stored in table order. table code -> index of its first column
+        first_columns: Dict[str, int] = {}
+        count = 0
+        for table in schema.tables:
+            first_columns[table.code] = count
+            count += len(table.columns)
+        s = self.string
+
+        for table in schema.tables:
+            # Keys, indexes and references refer to columns of the table by id. Not by identity, as references of
+            # stored tables may hold copies of the columns, see TableStore
+            column_index: Dict[str, int] = {}
+            first_column = self.column_count
+            for column in table.columns:
+                column_index[column.id] = self.column_count
+                data_type = column.data_type
+                self.columns += column_struct.pack(s(column.id), s(column.name), s(column.code), s(column.comment),
+                                                   s(data_type.name), self.number(data_type.length),
+                                                   self.number(data_type.precision), self.number(data_type.scale),
+                                                   1 if column.required else 0)
+                self.column_count += 1
+
+            first_key = self.key_count
+            for key in table.keys:
+                self.write_key(key, column_index)
+            primary_key = self.write_key(table.primary_key, column_index) if table.primary_key else NONE
+
+            first_index = self.index_count
+            for index in table.indexes:
+                refs = [column_index[c.id] for c in index.columns]
+                start = self.write_column_refs(refs)
+                self.indexes += index_struct.pack(s(index.id), s(index.code), s(index.name), 1 if index.unique else 0,
+                                                  start, len(refs))
+                self.index_count += 1
+
+            first_reference = self.reference_count
+            for reference in table.references:
+                parent = schema.tables_by_code[reference.parent_table]
+                parent_columns = {c.id: i for i, c in enumerate(parent.columns)}
+                parent_refs = [first_columns[parent.code] + parent_columns[c.id] for c in reference.parent_columns]
+                child_refs = [column_index[c.id] for c in reference.child_columns]
+                parent_start = self.write_column_refs(parent_refs)
+                child_start = self.write_column_refs(child_refs)
+                self.references += reference_struct.pack(
+                    s(reference.id), s(reference.code), s(reference.name), table_index[reference.parent_table],
+                    table_index[reference.child_table], parent_start, len(parent_refs), child_start, len(child_refs))
+                self.reference_count += 1
+
+            self.tables += table_struct.pack(
+                s(table.id), s(table.name), s(table.code), s(table.comment), first_column, len(table.columns),
+                first_key, len(table.keys), primary_key, first_index, len(table.indexes), first_reference,
+                len(table.references))
+
+        for sequence in schema.sequences:
+            self.sequences += uint_struct.pack(s(sequence.code))
+
+        table_order = bytearray()
+        for i in sorted(range(len(schema.tables)), key=lambda i: schema.tables[i].code):
+            table_order += uint_struct.pack(i)
+
+        db = s(schema.db)
+        string_offsets = bytearray()
+        offset = 0
+        for value in self.strings:
+            string_offsets += uint_struct.pack(offset)
+            offset += len(value)
+        string_offsets += uint_struct.pack(offset)
+        string_data = b''.join(self.strings)
+
+        sections = [
+            (string_offsets, len(self.strings)),
+            (string_data, len(string_data)),
+            (self.tables, len(schema.tables)),
+            (self.columns, self.column_count),
+            (self.keys, self.key_count),
+            (self.indexes, self.index_count),
+            (self.references, self.reference_count),
+            (self.column_refs, self.column_ref_count),
+            (self.sequences, len(schema.sequences)),
+            (table_order, len(schema.tables)),
+        ]
+        positions = []
+        offset = header_struct.size
+        for data, count in sections:
+            positions += [offset, count]
+            # Keep sections 4-byte aligned
+            offset += (len(data) + 3) & ~3
+
+        result = bytearray(header_struct.pack(MAGIC, VERSION, 0, db, *positions))
+        for data, _ in sections:
+            result += data
+            result += b'\0' * (-len(data) % 4)
+        return bytes(result)
+
+
+def to_image(schema: Schema) -> bytes:
+    """
+    Serialize the schema into a flat binary image, see :class:`SchemaImage`.
+    """
+    return _ImageWriter(schema).build()
+
+
+def write_image(schema: Schema, path: str):
+    with open(path, 'wb') as f:
+        f.write(to_image(schema))
+
+
+def share_image(schema: Schema, name: Optional[str] = None):
+    """
+    Copy the image of the schema into a new shared memory block. Requires Python 3.8+.
+
+    :param name: Name of the shared memory block. Default a random name
+    :return: multiprocessing.shared_memory.SharedMemory. The caller owns it and must close() and unlink() it
+    """
+    if shared_memory is None:
+        raise Exception('Shared memory requires Python 3.8 or newer')
+    image = to_image(schema)
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(image))
+    block.buf[:len(image)] = image
+    return block
+
+
+class SchemaImage:
+    """
+    Read-only access to a schema image, without deserializing it.
+
+    The image consists of a header, a string table and fixed-size records for tables, columns, keys, indexes and
+    references, which refer to each other and to strings by index. Records are unpacked from the underlying buffer
+    on access, so an image in a memory mapped file or in shared memory is shared by all processes reading it.
+
+    Views returned by the accessors have the same attributes as the model classes (Table, Column, etc.).
+    """
+
+    def __init__(self, buffer):
+        """
+        :param buffer: Buffer containing the image: bytes, mmap, shared memory buf, etc.
+        """
+        self.buffer = memoryview(buffer)
+        self._closers = []
+        # Data types by (name, length, precision, scale) ids, shared by the columns using them
+        self.data_types: Dict[Tuple[int, int, int, int], DataType] = {}
+        magic, version, _, db, *positions = header_struct.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise Exception('Not a schema image')
+        if version != VERSION:
+            raise Exception('Unsupported schema image version: {}'.format(version))
+        self.sections = {name: (positions[2 * i], positions[2 * i + 1]) for i, name in enumerate(SECTIONS)}
+        self.string_data_offset = self.sections['string_data'][0]
+        self.db = self.string(db)
+
+    @staticmethod
+    def open(path: str) -> 'SchemaImage':
+        """
+        Memory map an image file.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        image = SchemaImage(mapped)
+        image._closers.append(mapped.close)
+        return image
+
+    @staticmethod
+    def attach(name: str) -> 'SchemaImage':
+        """
+        Attach to an image in shared memory, see :func:`share_image`. Requires Python 3.8+.
+        """
+        if shared_memory is None:
+            raise Exception('Shared memory requires Python 3.8 or newer')
+        block = shared_memory.SharedMemory(name=name)
+        image = SchemaImage(block.buf)
+        image._closers.append(block.close)
+        return image
+
+    def close(self):
+        self.buffer.release()
+        for close in self._closers:
+            close()
+        self._closers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE:
+            return None
+        start, end = struct.unpack_from('<II', self.buffer, self.sections['string_offsets'][0] + 4 * string_id)
+        return str(self.buffer[self.string_data_offset + start:self.string_data_offset + end], 'utf-8')
+
+    def record(self, section: str, record_struct: struct.Struct, i: int) -> tuple:
+        return record_struct.unpack_from(self.buffer, self.sections[section][0] + record_struct.size * i)
+
+    def column_refs(self, start: int, count: int) -> List['ColumnView']:
+        offset = self.sections['column_refs'][0] + 4 * start
+        return [ColumnView(self, column_id) for column_id in struct.unpack_from('<{}I'.format(count), self.buffer,
+                                                                                 offset)]
+
+    @property
+    def tables(self) -> List['TableView']:
+        return [TableView(self, i) for i in range(self.sections['tables'][1])]
+
+    @property
+    def sequences(self) -> List[str]:
+        offset, count = self.sections['sequences']
+        return [self.string(i) for i in struct.unpack_from('<{}I'.format(count), self.buffer, offset)]
+
+    def get_table(self, code: str) -> Optional['TableView']:
+        # Binary search in table order, which is sorted by code
+        code = code.lower()
+        offset, count = self.sections['table_order']
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            table = TableView(self, uint_struct.unpack_from(self.buffer, offset + 4 * middle)[0])
+            table_code = table.code
+            if table_code == code:
+                return table
+            if table_code < code:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+class TableView:
+    __slots__ = ('image', 'index', 'record')
+
+    def __init__(self, image: SchemaImage, index: int):
+        self.image = image
+        self.index = index
+        self.record = image.record('tables', table_struct, index)
+
+    id = property(lambda self: self.image.string(self.record[0]))
+    name = property(lambda self: self.image.string(self.record[1]))
+    code = property(lambda self: self.image.string(self.record[2]))
+    comment = property(lambda self: self.image.string(self.record[3]))
+
+    @property
+    def columns(self) -> List['ColumnView']:
+        start, count = self.record[4:6]
+        return [ColumnView(self.image, i) for i in range(start, start + count)]
+
+    @property
+    def keys(self) -> List['KeyView']:
+        start, count = self.record[6:8]
+        return [KeyView(self.image, i) for i in range(start, start + count)]
+
+    @property
+    def primary_key(self) -> Optional['KeyView']:
+        return KeyView(self.image, self.record[8]) if self.record[8] != NONE else None
+
+    @property
+    def indexes(self) -> List['IndexView']:
+        start, count = self.record[9:11]
+        return [IndexView(self.image, i) for i in range(start, start + count)]
+
+    @property
+    def references(self) -> List['ReferenceView']:
+        start, count = self.record[11:13]
+        return [ReferenceView(self.image, i) for i in range(start, start + count)]
+
+    def __repr__(self):
+        return 'TableView(code={!r})'.format(self.code)
+
+
+class ColumnView:
+    __slots__ = ('image', 'record')
+
+    def __init__(self, image: SchemaImage, index: int):
+        self.image = image
+        self.record = image.record('columns', column_struct, index)
+
+    id = property(lambda self: self.image.string(self.record[0]))
+    name = property(lambda self: self.image.string(self.record[1]))
+    code = property(lambda self: self.image.string(self.record[2]))
+    comment = property(lambda self: self.image.string(self.record[3]))
+    required = property(lambda self: self.record[8] == 1)
+
+    @property
+    def data_type(self) -> DataType:
+        key = self.record[4:8]
+        result = self.image.data_types.get(key)
+        if result is None:
+            length, precision, scale = (None if n == NONE else n for n in key[1:])
+            result = self.image.data_types[key] = DataType(self.image.string(key[0]), length, precision, scale)
+        return result
+
+    def __repr__(self):
+        return 'ColumnView(code={!r})'.format(self.code)
+
+
+class KeyView:
+    __slots__ = ('image', 'record')
+
+    def __init__(self, image: SchemaImage, index: int):
+        self.image = image
+        self.record = image.record('keys', key_struct, index)
+
+    id = property(lambda self: self.image.string(self.record[0]))
+    code = property(lambda self: self.image.string(self.record[1]))
+    name = property(lambda self: self.image.string(self.record[2]))
+    columns = property(lambda self: self.image.column_refs(self.record[3], self.record[4]))
+
+
+class IndexView:
+    __slots__ = ('image', 'record')
+
+    def __init__(self, image: SchemaImage, index: int):
+        self.image = image
+        self.record = image.record('indexes', index_struct, index)
+
+    id = property(lambda self: self.image.string(self.record[0]))
+    code = property(lambda self: self.image.string(self.record[1]))
+    name = property(lambda self: self.image.string(self.record[2]))
+    unique = property(lambda self: self.record[3] == 1)
+    columns = property(lambda self: self.image.column_refs(self.record[4], self.record[5]))
+
+
+class ReferenceView:
+    __slots__ = ('image', 'record')
+
+    def __init__(self, image: SchemaImage, index: int):
+        self.image = image
+        self.record = image.record('references', reference_struct, index)
+
+    id = property(lambda self: self.image.string(self.record[0]))
+    code = property(lambda self: self.image.string(self.record[1]))
+    name = property(lambda self: self.image.string(self.record[2]))
+    parent_table = property(lambda self: TableView(self.image, self.record[3]).code)
+    child_table = property(lambda self: TableView(self.image, self.record[4]).code)
+    parent_columns = property(lambda self: self.image.column_refs(self.record[5], self.record[6]))
+    child_columns = property(lambda self: self.image.column_refs(self.record[7], self.record[8]))
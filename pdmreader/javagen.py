@@ -0,0 +1,129 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .models import Schema, Table
+from .renderer import Renderer
+
+# Generation state kept in the output package directory: {file name: {"since": date, "hash": content hash}}
+MANIFEST_NAME = '.pdmreader-javagen.json'
+
+since_pattern = re.compile(r'^ \* @since (\S+)$', re.MULTILINE)
+
+# Worker state, set once per worker process
+_generator: Optional['JavaGenerator'] = None
+
+
+def _init_worker(generator: 'JavaGenerator'):
+    global _generator
+    _generator = generator
+
+
+def _generate_in_worker(codes: List[str]) -> List[Tuple[str, Dict[str, str], bool]]:
+    return [_generator.generate_table(_generator.schema.get_table(code)) for code in codes]
+
+
+class JavaGenerator:
+    """
+    Generate one Java entity source file per table into a source tree.
+
+    Regeneration is incremental: the @since tag of an existing file is kept, and files whose content would not
+    change are not rewritten. Content hashes are kept in a manifest file, so unchanged files are not even read.
+    """
+
+    def __init__(self, schema: Schema, package: str, out_dir: str, jobs: Optional[int] = None):
+        """
+        :param schema: Schema to generate entities from
+        :param package: Java package of the entities
+        :param out_dir: Source root directory. Files are written into the package directory below it
+        :param jobs: Number of worker processes. Default number of CPUs
+        """
+        self.schema = schema
+        self.package = package
+        self.package_dir = os.path.join(out_dir, *package.split('.'))
+        self.jobs = jobs or os.cpu_count() or 1
+        self.manifest: Dict[str, Dict[str, str]] = {}
+        self.today = datetime.date.today().isoformat()
+
+    def generate(self, tables: List[Table]) -> Tuple[int, int]:
+        """
+        :return: Number of files written, and number of files unchanged
+        """
+        os.makedirs(self.package_dir, exist_ok=True)
+        self.manifest = self.read_manifest()
+
+        codes = [t.code for t in tables]
+        if self.jobs <= 1 or len(codes) < 2 * self.jobs:
+            results = [self.generate_table(table) for table in tables]
+        else:
+            chunk_size = max(1, min(256, len(codes) // (self.jobs * 4)))
+            chunks = [codes[i:i + chunk_size] for i in range(0, len(codes), chunk_size)]
+            with ProcessPoolExecutor(self.jobs, initializer=_init_worker, initargs=(self,)) as executor:
+                results = [r for chunk_results in executor.map(_generate_in_worker, chunks) for r in chunk_results]
+
+        written = 0
+        manifest_changed = False
+        for file_name, entry, changed in results:
+            if changed:
+                written += 1
+            if self.manifest.get(file_name) != entry:
+                self.manifest[file_name] = entry
+                manifest_changed = True
+
+        if manifest_changed:
+            self.write_manifest()
+
+        return written, len(results) - written
+
+    def generate_table(self, table: Table) -> Tuple[str, Dict[str, str], bool]:
+        """
+        :return: File name, its manifest entry, and whether the file was written
+        """
+        file_name = Renderer.upper_camel_case(table.code) + '.java'
+        path = os.path.join(self.package_dir, file_name)
+        entry = self.manifest.get(file_name)
+        exists = os.path.exists(path)
+
+        existing_content: Optional[str] = None
+        if exists and not entry:
+            with open(path, encoding='utf-8') as f:
+                existing_content = f.read()
+
+        since = entry['since'] if entry else self.read_since(existing_content) or self.today
+        column_types = Renderer.column_types(table, self.schema.db, 'java')
+        content = Renderer.render_java(table, column_types, self.package, since) + '\n'
+        content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        new_entry = {'since': since, 'hash': content_hash}
+
+        if exists and ((entry and entry['hash'] == content_hash) or existing_content == content):
+            return file_name, new_entry, False
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return file_name, new_entry, True
+
+    @staticmethod
+    def read_since(content: Optional[str]) -> Optional[str]:
+        if not content:
+            return None
+        m = since_pattern.search(content)
+        return m.group(1) if m else None
+
+    def read_manifest(self) -> Dict[str, Dict[str, str]]:
+        path = os.path.join(self.package_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def write_manifest(self):
+        path = os.path.join(self.package_dir, MANIFEST_NAME)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
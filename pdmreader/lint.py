@@ -0,0 +1,99 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .models import Column, Diagnostic, Schema, Table
+
+# Maximum identifier length in bytes before Oracle 12.2
+ORACLE_MAX_IDENTIFIER_LENGTH = 30
+
+
+class Linter:
+    """
+    Check the whole model in one pass, collecting every problem instead of stopping at the first one.
+
+    Problems found by the parser (dangling references, etc.) are only available if the schema is parsed in lenient
+    mode, see :class:`pdmreader.parser.PDMParser`.
+    """
+
+    def __init__(self, schema: Schema, max_identifier_length: int = ORACLE_MAX_IDENTIFIER_LENGTH):
+        self.schema = schema
+        self.max_identifier_length = max_identifier_length
+        self.diagnostics: List[Diagnostic] = []
+
+    def lint(self) -> List[Diagnostic]:
+        self.diagnostics = list(self.schema.diagnostics)
+
+        table_codes: Dict[str, int] = defaultdict(int)
+        # Constraint and index names share one namespace per schema in Oracle.
+        # name -> [(table code, generated by parser)]
+        constraint_names: Dict[str, List[Tuple[str, bool]]] = defaultdict(list)
+
+        for table in self.schema.tables:
+            table_codes[table.code] += 1
+            self.check_length(table.code, 'table', table.code)
+
+            if not table.primary_key:
+                self.add('warning', 'missing-primary-key', table.code, 'Table has no primary key')
+            else:
+                constraint_names[table.primary_key.code].append((table.code, False))
+                self.check_length(table.code, 'primary key', table.primary_key.code)
+
+            column_codes: Dict[str, int] = defaultdict(int)
+            for column in table.columns:
+                column_codes[column.code] += 1
+                self.check_length(table.code, 'column', column.code)
+            for code, count in column_codes.items():
+                if count > 1:
+                    self.add('error', 'duplicate-column', table.code,
+                             'Duplicate column code: {} ({} times)'.format(code, count))
+
+            for key in table.keys:
+                constraint_names[key.code].append((table.code, self.is_generated(table, key.code, key.columns, 'uk_')))
+                self.check_length(table.code, 'unique key', key.code)
+
+            for index in table.indexes:
+                prefix = 'uk_' if index.unique else 'idx_'
+                constraint_names[index.code].append(
+                    (table.code, self.is_generated(table, index.code, index.columns, prefix)))
+                self.check_length(table.code, 'index', index.code)
+
+            for reference in table.references:
+                constraint_names[reference.code].append((table.code, False))
+                self.check_length(table.code, 'foreign key', reference.code)
+
+        for code, count in table_codes.items():
+            if count > 1:
+                self.add('error', 'duplicate-table', code, 'Duplicate table code: {} ({} times)'.format(code, count))
+
+        for name, owners in constraint_names.items():
+            if len(owners) <= 1:
+                continue
+            tables = ', '.join(sorted({t for t, _ in owners}))
+            if any(generated for _, generated in owners):
+                self.add('error', 'generated-name-collision', owners[0][0],
+                         'Generated constraint/index name {} is used {} times, in tables: {}. Generated names join '
+                         'column codes and table code without separator'.format(name, len(owners), tables))
+            else:
+                self.add('error', 'duplicate-constraint', owners[0][0],
+                         'Duplicate constraint/index name {} is used {} times, in tables: {}'.format(
+                             name, len(owners), tables))
+
+        for sequence in self.schema.sequences:
+            self.check_length('', 'sequence', sequence.code)
+
+        self.diagnostics.sort(key=lambda d: (d.severity != 'error', d.table, d.check))
+        return self.diagnostics
+
+    def add(self, severity: str, check: str, table: str, message: str):
+        self.diagnostics.append(Diagnostic(severity, check, table, message))
+
+    def check_length(self, table: str, kind: str, identifier: str):
+        length = len(identifier.encode('utf-8'))
+        if length > self.max_identifier_length:
+            self.add('warning', 'identifier-too-long', table, '{} name {} is {} bytes long, longer than {}'.format(
+                kind.capitalize(), identifier, length, self.max_identifier_length))
+
+    @staticmethod
+    def is_generated(table: Table, code: str, columns: List[Column], prefix: str) -> bool:
+        # Same rule as TableParser uses when the model has no constraint name
+        return code == prefix + '_'.join([c.code for c in columns]) + table.code
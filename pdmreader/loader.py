@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+from typing import BinaryIO, Dict, List, Optional
+
+from . import source
+from .backends import RawTable
+from .models import Schema, Table
+from .parser import PDMParser
+from .suggest import build_indexes
+
+
+class LoadError(Exception):
+    """
+    Loading the model in the background failed. The message is one line, the error of loading is the cause.
+    """
+
+
+class _ProgressReader:
+    # Count bytes read from the stream
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class _ObservedParser(PDMParser):
+    # Publish tables as soon as they are parsed, waking up threads waiting for them
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.table_parsed = threading.Condition()
+        self.tables_by_code: Dict[str, Table] = {}
+
+    def table(self, table: RawTable):
+        super().table(table)
+        parsed = self.tables[-1]
+        with self.table_parsed:
+            self.tables_by_code[parsed.code] = parsed
+            self.table_parsed.notify_all()
+
+    def target_model(self, name: str):
+        with self.table_parsed:
+            super().target_model(name)
+            self.table_parsed.notify_all()
+
+
+class BackgroundLoader:
+    """
+    Parse a PDM file in a background thread, so that the model can be used while it is being loaded.
+
+    Tables are available as soon as they are parsed, without foreign keys. The schema is only available when the
+    whole file is parsed, see :meth:`wait`.
+    """
+
+    def __init__(self, file: str, backend: Optional[str] = None, strict: bool = True,
+                 only: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+        """
+        See :class:`pdmreader.parser.PDMParser` for the parameters.
+        """
+        self.parser = _ObservedParser(file, backend, strict, only, exclude)
+        self.schema: Optional[Schema] = None
+        self.error: Optional[BaseException] = None
+        self.reader: Optional[_ProgressReader] = None
+        # The uncompressed size of compressed files is unknown
+        self.total_bytes: Optional[int] = os.path.getsize(file) if source.is_plain(file) else None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='pdmreader-loader', daemon=True)
+
+    def start(self) -> 'BackgroundLoader':
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            with source.open_pdm(self.parser.file) as stream:
+                self.reader = _ProgressReader(stream)
+                schema = self.parser.parse_document(self.reader)
+            # Before the schema is published, so that the first unknown name is answered at once
+            build_indexes(schema)
+            self.schema = schema
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done.set()
+            # Wake up threads waiting for a table that is not in the file
+            with self.parser.table_parsed:
+                self.parser.table_parsed.notify_all()
+
+    @property
+    def loading(self) -> bool:
+        return not self.done.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self.done.is_set() and self.error is not None
+
+    def progress(self) -> str:
+        """
+        :return: Share of the file read, or megabytes read if the size is unknown, and number of tables parsed
+        """
+        bytes_read = self.reader.bytes_read if self.reader else 0
+        if self.total_bytes:
+            read = '{}%'.format(bytes_read * 100 // self.total_bytes)
+        else:
+            read = '{:.1f} MB'.format(bytes_read / 1024 / 1024)
+        return '{}, {} tables'.format(read, len(self.parser.tables_by_code))
+
+    def tables(self) -> List[Table]:
+        """
+        :return: Tables parsed so far, sorted by code
+        """
+        with self.parser.table_parsed:
+            tables = list(self.parser.tables_by_code.values())
+        return sorted(tables, key=lambda t: t.code)
+
+    def wait_for_table(self, code: str) -> Optional[Table]:
+        """
+        Wait until the table is parsed, or the whole file if there is no such table.
+
+        :return: The table, without foreign keys. None if there is no such table
+        :raise LoadError: If loading failed before the table was parsed
+        """
+        code = code.lower()
+        with self.parser.table_parsed:
+            self.parser.table_parsed.wait_for(lambda: code in self.parser.tables_by_code or not self.loading)
+            table = self.parser.tables_by_code.get(code)
+        if table is None and self.error:
+            raise LoadError(self.describe_error()) from self.error
+        return table
+
+    def wait_for_database_type(self) -> str:
+        """
+        Wait until the target model is parsed, which tells the database type. It comes after the tables and
+        references, but before the references are resolved and the schema is finished.
+
+        :return: mysql/oracle
+        :raise LoadError: If loading failed
+        """
+        with self.parser.table_parsed:
+            self.parser.table_parsed.wait_for(lambda: self.parser.target_model_name is not None or not self.loading)
+        db = self.parser.database_type(self.parser.target_model_name)
+        # Unsupported database types and load failures are reported as when the whole model is needed
+        return db if db and not self.error else self.wait().db
+
+    def wait(self) -> Schema:
+        """
+        Wait until the whole file is parsed.
+
+        :return: The schema
+        :raise LoadError: If loading failed
+        """
+        if self.loading:
+            print('Waiting for the model to load ({})...'.format(self.progress()), file=sys.stderr)
+            self.done.wait()
+        if self.error:
+            raise LoadError(self.describe_error()) from self.error
+        return self.schema
+
+    def describe_error(self) -> str:
+        # One line, like the errors reported when loading in the foreground
+        if isinstance(self.error, (FileNotFoundError, source.SourceError)):
+            return str(self.error)
+        lines = str(self.error).strip().splitlines()
+        return 'Failed to load {}: {}'.format(self.parser.file, lines[0] if lines else type(self.error).__name__)
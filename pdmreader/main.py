@@ -2,38 +2,122 @@ import argparse
 import os.path
 import readline
 import sys
+from typing import List, Optional
 
+from . import history, server, sidecar, source
+from .backends import backends
 from .command_executor import CommandExecutor
+from .completion import Completer
+from .loader import BackgroundLoader, LoadError
+from .metrics import Metrics
 from .parser import PDMParser
+from .suggest import build_indexes
+from .tablestore import TableStore
+
+
+single_table_commands = ('table', 'mysql', 'oracle', 'java')
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Interactive PDM reader')
-    parser.add_argument('file', help='PDM file')
+    # pdmreader http FILE ...: serve the file over HTTP instead, unless a file is named "http"
+    if sys.argv[1:2] == ['http'] and not source.exists('http'):
+        server.main(sys.argv[2:])
+        return
+    # pdmreader history ...: model history, likewise
+    if sys.argv[1:2] == ['history'] and not source.exists('history'):
+        history.main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description='Interactive PDM reader',
+                                     epilog='Run "pdmreader http FILE --port N" to serve FILE as JSON over HTTP, and '
+                                            '"pdmreader history --help" to record and query versions of a model')
+    parser.add_argument('file', help='PDM file. May be compressed (gzip/bzip2/xz), or ARCHIVE.zip!MEMBER.pdm')
+    parser.add_argument('--backend', choices=list(backends),
+                        help='XML parser backend. Default: {}'.format(next(iter(backends))))
+    parser.add_argument('--only', action='append', metavar='GLOB',
+                        help='Only load tables matching the glob. May be repeated')
+    parser.add_argument('--exclude', action='append', metavar='GLOB',
+                        help='Do not load tables matching the glob. May be repeated')
+    parser.add_argument('--metrics', action='store_true', help='Record latency of commands, see the timing command')
+    parser.add_argument('--metrics-out', metavar='FILE', help='Record latency of commands and write them as JSON '
+                                                              'to FILE at exit')
+    parser.add_argument('--index', action='store_true',
+                        help='For one-shot single table commands, parse only the table using a byte offset index of '
+                             'the file, FILE.pdmidx. The index is built on first use')
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help='Keep tables in a temporary file instead of memory, holding only recently used tables '
+                             'in memory, up to about MB megabytes')
     parser.add_argument('command', nargs=argparse.REMAINDER, help='Command and arguments. Optional')
     args = parser.parse_args()
 
-    if not os.path.exists(args.file):
+    if not source.exists(args.file):
         print("File not found: " + args.file, file=sys.stderr)
         return
 
     # interactive or one-shot command
     interactive = not args.command or len(args.command) == 0
 
-    schema = PDMParser(args.file).parse()
-    executor = CommandExecutor(schema, interactive)
+    # Collect model problems instead of failing on the first one when linting, or when lint may be run at the prompt
+    strict = not interactive and args.command[0] != 'lint'
+
+    # Commands that only need one table
+    single_table = not interactive and len(args.command) == 2 and args.command[0] in single_table_commands and \
+        not CommandExecutor.is_glob(args.command[1])
 
-    if not interactive:
-        executor.command(' '.join(args.command))
+    metrics = Metrics() if args.metrics or args.metrics_out else None
+    store = TableStore(args.max_memory * 1024 * 1024) if args.max_memory else None
+    # Tables parsed so far are only shared with the prompt while loaded in memory
+    if interactive and store is None:
+        # Load in the background, so that the prompt shows up at once
+        loader = BackgroundLoader(args.file, args.backend, strict, args.only, args.exclude).start()
+        executor = CommandExecutor(None, interactive, metrics, loader)
+    else:
+        try:
+            schema = None
+            if args.index and single_table and not args.only and not args.exclude:
+                schema = sidecar.load_table(args.file, args.command[1], args.backend, strict)
+            if schema is None:
+                schema = PDMParser(args.file, args.backend, strict, args.only, args.exclude, store).parse()
+        except (FileNotFoundError, source.SourceError) as e:
+            print(e, file=sys.stderr)
+            return
+        if interactive:
+            build_indexes(schema)
+        executor = CommandExecutor(schema, interactive, metrics)
+
+    try:
+        run_commands(executor, None if interactive else args.command)
+    finally:
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+
+
+def run_commands(executor: CommandExecutor, one_shot_command: Optional[List[str]]):
+    if one_shot_command:
+        executor.command(' '.join(one_shot_command))
         return
 
     history_file = os.path.expanduser('~/.pdmreader_history')
     if os.path.exists(history_file):
         readline.read_history_file(history_file)
+    completer = Completer(None, CommandExecutor.command_arguments)
+    completer.install()
 
     try:
         while True:
-            command: str = input('>>> ').strip()
+            # Summary and code completion once the model is loaded
+            if not completer.has_schema and not executor.loading and not executor.load_failed:
+                try:
+                    if executor.loader:
+                        executor.print_summary()
+                    completer.set_schema(executor.schema)
+                except LoadError as e:
+                    # Commands needing the model report the error again
+                    print(e, file=sys.stderr)
+                    executor.load_failed = True
+
+            prompt = '[loading {}] >>> '.format(executor.loader.progress()) if executor.loading else '>>> '
+            command: str = input(prompt).strip()
             if not command:
                 continue
             executor.command(command)
@@ -0,0 +1,160 @@
+import contextlib
+import json
+import math
+import sys
+import time
+from typing import Callable, Dict, Optional, TextIO
+
+# Phases of a command. Time not spent in any of them is counted in the command total only
+PHASES = ('lookup', 'type_mapping', 'render')
+
+# Command name recorded for lines which are not a known command
+UNKNOWN_COMMAND = 'unknown'
+
+
+# Buckets per doubling of values. Percentiles are bucket bounds, within 2 ** (1 / 8) - 1 = 9% of the exact value
+BUCKETS_PER_DOUBLING = 8
+
+
+class Histogram:
+    """
+    Counts of values in log-spaced buckets, so that memory does not grow with the number of values.
+    Bucket i counts values in (2 ** ((i - 1) / BUCKETS_PER_DOUBLING), 2 ** (i / BUCKETS_PER_DOUBLING)], values not
+    above 0 are counted apart.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}  # bucket index -> count
+        self.zeros = 0  # values <= 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        if value <= 0:
+            self.zeros += 1
+        else:
+            bucket = math.ceil(math.log2(value) * BUCKETS_PER_DOUBLING)
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.min = value if self.count == 0 else min(self.min, value)
+        self.max = value if self.count == 0 else max(self.max, value)
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, p: float) -> float:
+        """
+        :param p: Percentile, 0-100
+        :return: Nearest-rank percentile, as the upper bound of its bucket. 0 if there is no value
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        if rank <= self.zeros:
+            return self.min
+        seen = self.zeros
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                bound = 2 ** (bucket / BUCKETS_PER_DOUBLING)
+                return min(max(bound, self.min), self.max)
+        return self.max
+
+    def buckets(self) -> Dict[str, int]:
+        # Power of 2 upper bounds: "1" counts values <= 1, "2" values in (1, 2], etc.
+        result: Dict[str, int] = {'1': self.zeros} if self.zeros else {}
+        for bucket, count in self.counts.items():
+            exponent = math.ceil(bucket / BUCKETS_PER_DOUBLING)
+            bound = str(1 if exponent <= 0 else 2 ** exponent)
+            result[bound] = result.get(bound, 0) + count
+        return dict(sorted(result.items(), key=lambda item: int(item[0])))
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': self.buckets(),
+        }
+
+
+class CommandMetrics:
+    def __init__(self):
+        self.latency = Histogram()  # milliseconds
+        self.phases: Dict[str, Histogram] = {phase: Histogram() for phase in PHASES}  # milliseconds
+        self.output_size = Histogram()  # characters
+
+    def to_dict(self) -> dict:
+        return {
+            'latency_ms': self.latency.to_dict(),
+            'phases_ms': {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            'output_chars': self.output_size.to_dict(),
+        }
+
+
+class _CountingWriter:
+    # Forward writes to the real output, counting characters
+    def __init__(self, output: TextIO):
+        self.output = output
+        self.count = 0
+
+    def write(self, s: str) -> int:
+        self.count += len(s)
+        return self.output.write(s)
+
+    def flush(self):
+        self.output.flush()
+
+
+class Metrics:
+    """
+    Latency and output size of commands, by command name. Each command is further broken down into phases,
+    measured with :meth:`phase` by the command implementation.
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, CommandMetrics] = {}
+        self.current_phases: Optional[Dict[str, float]] = None  # phase -> seconds, of the running command
+
+    def measure(self, name: str, func: Callable, *args):
+        """
+        Run a command and record its latency, phase times and the size of what it prints to stdout.
+
+        :param name: Command name to record under
+        """
+        self.current_phases = {phase: 0.0 for phase in PHASES}
+        writer = _CountingWriter(sys.stdout)
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(writer):
+                return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics = self.commands.get(name)
+            if metrics is None:
+                metrics = self.commands[name] = CommandMetrics()
+            metrics.latency.add(elapsed * 1000)
+            for phase, seconds in self.current_phases.items():
+                metrics.phases[phase].add(seconds * 1000)
+            metrics.output_size.add(writer.count)
+            self.current_phases = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current_phases is not None:
+                self.current_phases[name] += time.perf_counter() - start
+
+    def to_dict(self) -> dict:
+        return {name: metrics.to_dict() for name, metrics in sorted(self.commands.items())}
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
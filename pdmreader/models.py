@@ -1,5 +1,9 @@
-from dataclasses import dataclass
-from typing import List, Optional
+import collections.abc
+from abc import abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import fnmatch
 import re
 
 
@@ -24,13 +28,23 @@ class TypeUtil:
         return False
 
 
-@dataclass
+@dataclass(frozen=True)
 class DataType:
     name: str
     length: Optional[str] = None
     precision: Optional[str] = None
     scale: Optional[str] = None
 
+    # Precomputed, as types are shared by many columns and rendered often
+    numeric: bool = field(init=False, repr=False, compare=False)
+    string: bool = field(init=False, repr=False, compare=False)
+    text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'numeric', TypeUtil.is_numeric(self.name))
+        object.__setattr__(self, 'string', TypeUtil.is_string(self.name))
+        object.__setattr__(self, 'text', self.__expr__())
+
     def __expr__(self):
         if self.is_numeric():
             if self.precision and self.scale:
@@ -44,16 +58,16 @@ class DataType:
         return self.name
 
     def __str__(self):
-        return self.__expr__()
+        return self.text
 
     def is_numeric(self):
-        return TypeUtil.is_numeric(self.name)
+        return self.numeric
 
     def is_string(self):
-        return TypeUtil.is_string(self.name)
+        return self.string
 
 
-@dataclass
+@dataclass(frozen=True)
 class Column:
     id: str
     name: str
@@ -63,42 +77,249 @@ class Column:
     data_type: DataType
 
 
-@dataclass
+@dataclass(frozen=True)
 class Key:
     id: str
     code: str
     name: str
-    columns: List[Column]
+    columns: Tuple[Column, ...]
 
 
-@dataclass
+@dataclass(frozen=True)
 class Index:
     id: str
     code: str
     name: str
     unique: bool
-    columns: List[Column]
+    columns: Tuple[Column, ...]
 
 
-@dataclass
+@dataclass(frozen=True)
+class Reference:
+    id: str
+    code: str
+    name: str
+    parent_table: str  # code of the referenced table
+    child_table: str  # code of the referencing table
+    parent_columns: Tuple[Column, ...]
+    child_columns: Tuple[Column, ...]
+
+
+@dataclass(frozen=True)
 class Table:
     id: str
     name: str
     code: str
     comment: str
-    columns: List[Column]
-    keys: List[Key]  # unique keys (primary key excluded)
+    columns: Tuple[Column, ...]
+    keys: Tuple[Key, ...]  # unique keys (primary key excluded)
     primary_key: Optional[Key]
-    indexes: List[Index]
+    indexes: Tuple[Index, ...]
+    references: Tuple[Reference, ...] = ()  # foreign keys of this table
+
+
+class TableSequence(collections.abc.Sequence):
+    """
+    Read-only sequence of tables sorted by code, which need not all be held in memory, such as a
+    :class:`pdmreader.tablestore.TableStore`. Usable as :attr:`Schema.tables`.
 
+    Codes and names of the tables are available without loading any table.
+    """
+    codes: List[str]  # code of each table
+    names: List[str]  # name of each table
 
-@dataclass
+    @abstractmethod
+    def by_code(self) -> Mapping[str, Table]:
+        """
+        :return: Mapping from table code to table, loading only the tables looked up
+        """
+
+    @abstractmethod
+    def find_by_ids(self, ids: Iterable[str]) -> List[Table]:
+        """
+        :return: Tables having the given ids, in no particular order
+        """
+
+
+@dataclass(frozen=True)
 class Sequence:
     code: str
 
 
-@dataclass
+@dataclass(frozen=True)
+class Diagnostic:
+    severity: str  # error/warning
+    check: str
+    table: str  # table code, empty if not about a table
+    message: str
+
+
+@dataclass(frozen=True)
 class Schema:
+    """
+    Parsed model. Immutable and hashable, so it can be shared between threads without locking.
+
+    Derived data (indexes, statistics) is computed on first use and kept in :attr:`cache`. Concurrent first uses may
+    compute the same value more than once, but never see a partial one.
+    """
     db: str  # mysql/oracle
-    tables: List[Table]
-    sequences: List[Sequence]
+    tables: Tuple[Table, ...]  # or a TableSequence, such as tables kept on disk
+    sequences: Tuple[Sequence, ...]
+    references: Tuple[Reference, ...] = ()
+    # Problems found when parsed in lenient mode
+    diagnostics: Tuple[Diagnostic, ...] = field(default=(), repr=False, compare=False)
+
+    # Dependency graph as adjacency lists of table codes, self references excluded.
+    # dependencies: table -> tables it references; dependents: table -> tables referencing it
+    dependencies: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    dependents: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    tables_by_code: Mapping[str, Table] = field(init=False, repr=False, compare=False)
+    # Derived data computed on demand, see typestats
+    cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        stored = isinstance(self.tables, TableSequence)
+
+        # Accept any sequences, store tuples
+        for name in ('tables', 'sequences', 'references', 'diagnostics'):
+            if not (name == 'tables' and stored):
+                object.__setattr__(self, name, tuple(getattr(self, name)))
+
+        # Stored tables are not loaded for their codes
+        codes = self.tables.codes if stored else [t.code for t in self.tables]
+        dependencies: Dict[str, List[str]] = {code: [] for code in codes}
+        dependents: Dict[str, List[str]] = {code: [] for code in codes}
+        edges = set()
+        for reference in self.references:
+            edge = (reference.child_table, reference.parent_table)
+            if reference.child_table == reference.parent_table or edge in edges:
+                continue
+            edges.add(edge)
+            dependencies[reference.child_table].append(reference.parent_table)
+            dependents[reference.parent_table].append(reference.child_table)
+
+        object.__setattr__(self, 'tables_by_code', self.tables.by_code() if stored else
+                           {t.code: t for t in self.tables})
+        object.__setattr__(self, 'dependencies', {code: tuple(codes) for code, codes in dependencies.items()})
+        object.__setattr__(self, 'dependents', {code: tuple(codes) for code, codes in dependents.items()})
+
+    def __hash__(self):
+        # Hashing walks the whole model, do it once
+        if 'hash' not in self.cache:
+            # Table by table, so that stored tables need not all be loaded at once
+            self.cache['hash'] = hash((self.db, tuple(map(hash, self.tables)), self.sequences, self.references))
+        return self.cache['hash']
+
+    def get_table(self, code: str) -> Optional[Table]:
+        return self.tables_by_code.get(code.lower())
+
+    def find_tables(self, glob: str) -> List[Table]:
+        """
+        :param glob: Shell-style glob, case insensitive
+        :return: Tables whose code matches the glob, in schema order
+        """
+        pattern = re.compile(fnmatch.translate(glob), re.IGNORECASE)
+        if isinstance(self.tables, TableSequence):
+            # Load matching tables only
+            return [self.tables[i] for i, code in enumerate(self.tables.codes) if pattern.match(code)]
+        return [t for t in self.tables if pattern.match(t.code)]
+
+    def table_names(self) -> List[Tuple[str, str]]:
+        """
+        :return: Code and name of each table, in schema order
+        """
+        if isinstance(self.tables, TableSequence):
+            # Without loading any table
+            return list(zip(self.tables.codes, self.tables.names))
+        return [(t.code, t.name) for t in self.tables]
+
+    def find_sequences(self, glob: str) -> List[Sequence]:
+        """
+        :param glob: Shell-style glob, case insensitive
+        :return: Sequences whose code matches the glob, in schema order
+        """
+        pattern = re.compile(fnmatch.translate(glob), re.IGNORECASE)
+        return [s for s in self.sequences if pattern.match(s.code)]
+
+    def column_types(self, table: Table, target: str) -> List[str]:
+        """
+        :param target: mysql/oracle/java
+        :return: Data types of the table columns, converted to the target
+        """
+        from .renderer import Renderer
+        return Renderer.column_types(table, self.db, target)
+
+    def render_ddl(self, table: Union[Table, str], target: str, column_types: Optional[List[str]] = None,
+                   since: Optional[str] = None, foreign_keys: bool = False) -> str:
+        """
+        Generate DDL (mysql/oracle) or entity definition (java) of a table.
+
+        :param table: Table, or table code
+        :param target: mysql/oracle/java
+        :param column_types: Converted column types, see :meth:`column_types`. Converted if not given
+        :param since: Value of the @since tag of Java entities. Default today
+        :param foreign_keys: Whether DDL includes foreign key constraints, for tables created in dependency order,
+            see :meth:`sort_by_dependencies`
+        :raise KeyError: If there is no table with the code
+        :raise ValueError: If the target is unknown
+        """
+        from .renderer import Renderer
+        if isinstance(table, str):
+            code = table
+            table = self.get_table(code)
+            if not table:
+                raise KeyError('Table not found: ' + code)
+        if target not in ('mysql', 'oracle', 'java'):
+            raise ValueError('Unknown target: ' + target)
+        if column_types is None:
+            column_types = self.column_types(table, target)
+
+        if target == 'mysql':
+            return Renderer.render_mysql(table, column_types, foreign_keys)
+        elif target == 'oracle':
+            return Renderer.render_oracle(table, column_types, foreign_keys)
+        return Renderer.render_java(table, column_types, since=since)
+
+    def sort_by_dependencies(self, tables: List[Table]) -> Tuple[List[Table], List[str]]:
+        """
+        Sort tables so that every table comes after the tables it references (Kahn's algorithm).
+        References to tables not in the given list are ignored.
+
+        :param tables: Tables to sort
+        :return: Sorted tables, and a dependency cycle as a list of table codes (empty if there is none).
+            Tables which cannot be ordered because of cycles are appended in their original order.
+        """
+        codes = {t.code for t in tables}
+        pending: Dict[str, int] = {}
+        for table in tables:
+            pending[table.code] = sum(1 for parent in self.dependencies.get(table.code, []) if parent in codes)
+
+        queue = deque(t for t in tables if pending[t.code] == 0)
+        result: List[Table] = []
+        while queue:
+            table = queue.popleft()
+            result.append(table)
+            for child in self.dependents.get(table.code, []):
+                if child in pending:
+                    pending[child] -= 1
+                    if pending[child] == 0:
+                        queue.append(self.tables_by_code[child])
+
+        if len(result) == len(tables):
+            return result, []
+
+        remaining = [t for t in tables if pending[t.code] > 0]
+        return result + remaining, self.find_cycle(remaining)
+
+    def find_cycle(self, tables: List[Table]) -> List[str]:
+        # Every table left over by the topological sort references at least one other left over table,
+        # so following references from any of them must run into a cycle
+        codes = {t.code for t in tables}
+        path: List[str] = []
+        positions: Dict[str, int] = {}
+        code = tables[0].code
+        while code not in positions:
+            positions[code] = len(path)
+            path.append(code)
+            code = next(parent for parent in self.dependencies[code] if parent in codes)
+        return path[positions[code]:] + [code]
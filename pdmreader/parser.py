@@ -1,87 +1,91 @@
 import dataclasses
+import fnmatch
 import re
-from typing import List, Optional
-from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, SubElement
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
 
-from .models import TypeUtil, DataType, Column, Key, Index, Table, Sequence, Schema
-
-namespaces = {
-    'a': 'attribute',
-    'c': 'collection',
-    'o': 'object',
-}
-
-
-def find_text(node: Element, path: str, lowercase: bool = True) -> str:
-    text = node.findtext(path, '', namespaces).strip()
-    if lowercase:
-        text = text.lower()
-    return text
-
-
-def find_nodes(node: Element, path: str) -> List[Element]:
-    nodes: List[Element] = node.findall(path, namespaces)
-    return nodes or []
+from .backends import get_backend, ModelHandler, RawReference, RawTable
+from .models import TypeUtil, DataType, Column, Diagnostic, Key, Index, Reference, Table, Sequence, Schema
+from .source import open_pdm
+from .tablestore import TableStore
 
 
 class TableParser:
-    def __init__(self, table_node: Element):
-        self.table_node = table_node
-        self.table_id: str = table_node.attrib['Id']
-        self.table_name = find_text(table_node, 'a:Name')
-        self.table_code = find_text(table_node, 'a:Code')
-        self.table_comment = find_text(table_node, 'a:Comment', False)
+    def __init__(self, raw_table: RawTable, diagnostics: Optional[List[Diagnostic]] = None,
+                 data_types: Optional[Dict[Tuple[str, str], DataType]] = None):
+        """
+        :param raw_table: Table read by a parser backend
+        :param diagnostics: If given, problems are collected here and parsing goes on. Otherwise raise on the first
+            problem
+        :param data_types: Parsed data types by (data type, length), shared by the tables of a model. A model has few
+            distinct types, shared by all its columns
+        """
+        self.raw_table = raw_table
+        self.diagnostics = diagnostics
+        self.data_types = data_types if data_types is not None else {}
+        self.columns_by_id: Dict[str, Column] = {}
+        self.table_id: str = raw_table.id
+        self.table_name = raw_table.name.lower()
+        self.table_code = raw_table.code.lower()
+        self.table_comment = raw_table.comment
         if self.table_name == self.table_code:
             self.table_name = ''
 
+    def error(self, check: str, message: str):
+        if self.diagnostics is None:
+            raise Exception(message)
+        self.diagnostics.append(Diagnostic('error', check, self.table_code, message))
+
     def parse(self) -> Table:
         columns = self.parse_columns()
+        self.columns_by_id = {c.id: c for c in columns}
         keys = self.parse_keys(columns)
         primary_key = self.parse_primary_key(keys)
         indexes = self.parse_indexes(columns)
 
         table = Table(id=self.table_id, name=self.table_name, code=self.table_code, comment=self.table_comment,
-                      columns=columns,
-                      keys=keys, primary_key=primary_key, indexes=indexes)
+                      columns=tuple(columns),
+                      keys=tuple(keys), primary_key=primary_key, indexes=tuple(indexes))
         return table
 
     def parse_columns(self) -> List[Column]:
-        column_nodes = find_nodes(self.table_node, 'c:Columns/o:Column')
         columns: List[Column] = []
-        for column_node in column_nodes:
-            column_id = column_node.attrib['Id']
-            name = find_text(column_node, 'a:Name')
-            code = find_text(column_node, 'a:Code')
-            comment = find_text(column_node, 'a:Comment', False)
-            data_type = find_text(column_node, 'a:DataType')
-            length = find_text(column_node, 'a:Length')
-            required = find_text(column_node, 'a:Column.Mandatory') == '1'
+        for raw_column in self.raw_table.columns:
+            column_id = raw_column.id
+            name = raw_column.name.lower()
+            code = raw_column.code.lower()
+            comment = raw_column.comment
+            data_type = raw_column.data_type.lower()
+            length = raw_column.length.lower()
+            required = raw_column.mandatory == '1'
 
             if name == code:
                 name = ''
 
+            try:
+                parsed_data_type = self.get_data_type(data_type, length)
+            except Exception as e:
+                self.error('unknown-data-type', str(e))
+                parsed_data_type = DataType(name=data_type)
+
             column = Column(id=column_id, name=name, code=code, required=required, comment=comment,
-                            data_type=TableParser.parse_data_type(data_type, length))
+                            data_type=parsed_data_type)
             columns.append(column)
 
         return columns
 
     def parse_keys(self, columns: List[Column]) -> List[Key]:
         keys: List[Key] = []
-        nodes = find_nodes(self.table_node, 'c:Keys/o:Key')
-        for node in nodes:
-            key_id: str = node.attrib['Id']
-            name = find_text(node, 'a:Name')
-            code = find_text(node, 'a:ConstraintName')
+        for raw_key in self.raw_table.keys:
+            key_id: str = raw_key.id
+            name = raw_key.name.lower()
+            code = raw_key.constraint_name.lower()
 
             key_columns: List[Column] = []
-            column_nodes = find_nodes(node, 'c:Key.Columns/o:Column')
-            for column_node in column_nodes:
-                ref = column_node.attrib['Ref']
-                column = next((c for c in columns if c.id == ref), None)
+            for ref in raw_key.column_refs:
+                column = self.columns_by_id.get(ref)
                 if not column:
-                    raise Exception("Unknown column in key: key={}, ref={}".format(key_id, ref))
+                    self.error('dangling-ref', "Unknown column in key: key={}, ref={}".format(key_id, ref))
+                    continue
                 key_columns.append(column)
 
             if len(key_columns) == 0:
@@ -90,7 +94,7 @@ class TableParser:
             if not code:
                 code = 'uk_' + '_'.join([c.code for c in key_columns]) + self.table_code
 
-            key = Key(id=key_id, code=code, name=name, columns=key_columns)
+            key = Key(id=key_id, code=code, name=name, columns=tuple(key_columns))
             keys.append(key)
 
         return keys
@@ -99,14 +103,17 @@ class TableParser:
         if len(keys) == 0:
             return None
 
-        nodes = find_nodes(self.table_node, 'c:PrimaryKey/o:Key')
-        if len(nodes) != 1:
-            raise Exception("Unexpected number of keys in primary key")
+        refs = self.raw_table.primary_key_refs
+        if len(refs) != 1:
+            self.error('primary-key-count', "Unexpected number of keys in primary key")
+            if len(refs) == 0:
+                return None
 
-        ref: str = nodes[0].attrib['Ref']
+        ref: str = refs[0]
         key = next((k for k in keys if k.id == ref), None)
         if not key:
-            raise Exception("Unknown primary key: ref={}".format(ref))
+            self.error('dangling-ref', "Unknown primary key: ref={}".format(ref))
+            return None
 
         # Remove from key list
         keys.remove(key)
@@ -119,23 +126,21 @@ class TableParser:
 
     def parse_indexes(self, columns: List[Column]) -> List[Index]:
         indexes: List[Index] = []
-        nodes = find_nodes(self.table_node, 'c:Indexes/o:Index')
-        for node in nodes:
-            if len(find_nodes(node, 'c:LinkedObject/o:Key')) > 0:
+        for raw_index in self.raw_table.indexes:
+            if raw_index.linked_to_key:
                 continue
 
-            index_id: str = node.attrib['Id']
-            name = find_text(node, 'a:Name')
-            code = find_text(node, 'a:Code')
-            unique = find_text(node, 'a:Unique') == '1'
+            index_id: str = raw_index.id
+            name = raw_index.name.lower()
+            code = raw_index.code.lower()
+            unique = raw_index.unique == '1'
 
             index_columns: List[Column] = []
-            column_nodes = find_nodes(node, 'c:IndexColumns/o:IndexColumn/c:Column/o:Column')
-            for column_node in column_nodes:
-                ref = column_node.attrib['Ref']
-                column = next((c for c in columns if c.id == ref), None)
+            for ref in raw_index.column_refs:
+                column = self.columns_by_id.get(ref)
                 if not column:
-                    raise Exception("Unknown column in index: index={}, ref={}".format(index_id, ref))
+                    self.error('dangling-ref', "Unknown column in index: index={}, ref={}".format(index_id, ref))
+                    continue
                 index_columns.append(column)
 
             if len(index_columns) == 0:
@@ -144,7 +149,7 @@ class TableParser:
             if not code:
                 code = ('uk_' if unique else 'idx_') + '_'.join([c.code for c in index_columns]) + self.table_code
 
-            index = Index(id=index_id, code=code, name=name, unique=unique, columns=index_columns)
+            index = Index(id=index_id, code=code, name=name, unique=unique, columns=tuple(index_columns))
             indexes.append(index)
 
         return indexes
@@ -155,6 +160,16 @@ class TableParser:
             return int(string)
         return None
 
+    def get_data_type(self, data_type: str, length: str) -> DataType:
+        """
+        Like :meth:`parse_data_type`, returning the same instance for the same arguments.
+        """
+        key = (data_type, length)
+        result = self.data_types.get(key)
+        if result is None:
+            result = self.data_types[key] = TableParser.parse_data_type(data_type, length)
+        return result
+
     @staticmethod
     def parse_data_type(data_type: str, length: str) -> DataType:
         m = re.fullmatch(r'(?P<type>[\w\d]*)(\((?P<precision>\d+)(,\s*(?P<scale>\d+))?\))?', data_type)
@@ -175,59 +190,189 @@ class TableParser:
         return DataType(name=data_type)
 
 
-class PDMParser:
-    def __init__(self, file: str):
+class PDMParser(ModelHandler):
+    def __init__(self, file: str, backend: Optional[str] = None, strict: bool = True,
+                 only: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 store: Optional[TableStore] = None):
+        """
+        :param file: PDM file path. See :func:`pdmreader.source.open_pdm`
+        :param backend: Parser backend name. See :mod:`pdmreader.backends`
+        :param strict: Raise on the first problem in the model. Otherwise collect problems into
+            Schema.diagnostics, skipping the broken parts
+        :param only: Shell-style globs of table codes. If given, only matching tables are loaded
+        :param exclude: Shell-style globs of table codes not to load.
+            References from or to tables not loaded are dropped
+        :param store: If given, tables are written into the store as they are parsed, instead of being kept in memory
+        """
         self.file = file
-        self.tree: ElementTree = ElementTree.parse(file)
-        self.root: Element = self.tree.getroot()
+        self.backend = get_backend(backend)
+        self.diagnostics: Optional[List[Diagnostic]] = None if strict else []
+        self.only = self.compile_globs(only)
+        self.exclude = self.compile_globs(exclude)
+        self.skipped_table_ids: Set[str] = set()
+        self.target_model_name: Optional[str] = None
+        self.store = store
+        self.tables: List[Table] = []
+        self.sequences: List[Sequence] = []
+        self.raw_references: List[RawReference] = []
+        # Data types shared by the columns of this model, see TableParser.get_data_type
+        self.data_types: Dict[Tuple[str, str], DataType] = {}
 
     def parse(self) -> Schema:
+        with open_pdm(self.file) as source:
+            return self.parse_document(source)
+
+    def parse_document(self, source: BinaryIO) -> Schema:
+        """
+        Parse a PDM document from a stream instead of the file, such as one synthesized by :mod:`pdmreader.sidecar`.
+        """
+        self.backend.parse(source, self)
+
         db = self.detect_database_type()
-        sequences = self.parse_sequences()
-        tables = self.parse_tables()
-        schema = Schema(db, tables, sequences)
+
+        if self.store is not None:
+            return self.finish_store(db)
+
+        # sort by code
+        self.tables.sort(key=lambda t: t.code)
+        self.sequences.sort(key=lambda t: t.code)
+
+        references = self.parse_references(self.tables)
+
+        # Attach foreign keys to their tables
+        references_by_table: Dict[str, List[Reference]] = {}
+        for reference in references:
+            references_by_table.setdefault(reference.child_table, []).append(reference)
+        tables = [dataclasses.replace(t, references=tuple(references_by_table[t.code]))
+                  if t.code in references_by_table else t for t in self.tables]
+
+        schema = Schema(db, tables, self.sequences, references, diagnostics=self.diagnostics or [])
         return schema
 
-    def detect_database_type(self) -> str:
-        text = find_text(self.root, 'o:RootObject/c:Children/o:Model/c:TargetModels/o:TargetModel/a:Name', True)
+    def finish_store(self, db: str) -> Schema:
+        self.sequences.sort(key=lambda t: t.code)
+
+        # Resolve references one at a time, so that only the tables of a reference need to be loaded
+        references: List[Reference] = []
+        for raw_reference in self.raw_references:
+            tables = self.store.find_by_ids({raw_reference.parent_table_ref, raw_reference.child_table_ref})
+            references += self.parse_references(tables, [raw_reference])
+
+        # Attach foreign keys to their tables
+        references_by_table: Dict[str, List[Reference]] = {}
+        for reference in references:
+            references_by_table.setdefault(reference.child_table, []).append(reference)
+        for code, table_references in references_by_table.items():
+            self.store.add_references(code, tuple(table_references))
+
+        self.store.finish()
+        return Schema(db, self.store, self.sequences, references, diagnostics=self.diagnostics or [])
+
+    def target_model(self, name: str):
+        if self.target_model_name is None:
+            self.target_model_name = name
+
+    def sequence(self, code: str):
+        self.sequences.append(Sequence(code.lower()))
+
+    def accept_table(self, table_id: str, code: str) -> bool:
+        if (self.only and not self.only.match(code)) or (self.exclude and self.exclude.match(code)):
+            self.skipped_table_ids.add(table_id)
+            return False
+        return True
+
+    def table(self, table: RawTable):
+        parsed = TableParser(table, self.diagnostics, self.data_types).parse()
+        if self.store is not None:
+            self.store.add(parsed)
+        else:
+            self.tables.append(parsed)
+
+    def reference(self, reference: RawReference):
+        self.raw_references.append(reference)
+
+    @staticmethod
+    def database_type(target_model_name: Optional[str]) -> Optional[str]:
+        """
+        :return: mysql/oracle. None if the target model is not a supported database
+        """
+        text = (target_model_name or '').lower()
         if 'mysql' in text:
             return 'mysql'
         elif 'oracle' in text:
             return 'oracle'
+        return None
+
+    def detect_database_type(self) -> str:
+        db = self.database_type(self.target_model_name)
+        if db:
+            return db
+        text = (self.target_model_name or '').lower()
+        if self.diagnostics is not None:
+            self.diagnostics.append(Diagnostic('error', 'database-type', '', 'Unsupported database type: ' + text))
+            return text
         else:
             raise Exception('Unsupported database type: ' + text)
 
-    def parse_tables(self) -> List[Table]:
-        table_nodes = find_nodes(self.root, 'o:RootObject/c:Children/o:Model/c:Tables/o:Table')
-        tables: List[Table] = []
-
-        for table_node in table_nodes:
-            table = TableParser(table_node).parse()
-            tables.append(table)
+    def parse_references(self, tables: List[Table],
+                         raw_references: Optional[List[RawReference]] = None) -> List[Reference]:
+        """
+        :param tables: Tables the references may point to
+        :param raw_references: References to parse. Default all references of the file
+        """
+        tables_by_id = {t.id: t for t in tables}
+        columns_by_id = {c.id: c for t in tables for c in t.columns}
+        references: List[Reference] = []
+
+        def resolve(mapping: Dict, ref: str, reference_id: str):
+            value = mapping.get(ref)
+            if value is None:
+                message = "Unknown object in reference: reference={}, ref={}".format(reference_id, ref)
+                if self.diagnostics is None:
+                    raise Exception(message)
+                self.diagnostics.append(Diagnostic('error', 'dangling-ref', '', message))
+            return value
+
+        for raw_reference in self.raw_references if raw_references is None else raw_references:
+            reference_id: str = raw_reference.id
+            if raw_reference.parent_table_ref in self.skipped_table_ids or \
+                    raw_reference.child_table_ref in self.skipped_table_ids:
+                continue
 
-        # sort by code
-        tables.sort(key=lambda t: t.code)
+            name = raw_reference.name.lower()
+            code = (raw_reference.constraint_name or raw_reference.code).lower()
+            parent_table = tables_by_id.get(raw_reference.parent_table_ref)
+            child_table = tables_by_id.get(raw_reference.child_table_ref)
+            if not parent_table or not child_table:
+                # Tables of other packages or models are referenced through shortcuts, which are not parsed.
+                # Such references are valid, only their foreign keys cannot be generated
+                if self.diagnostics is not None:
+                    message = 'Reference to a table not in the model, such as a shortcut: reference=' + reference_id
+                    self.diagnostics.append(Diagnostic('warning', 'external-reference',
+                                                       child_table.code if child_table else '', message))
+                continue
 
-        return tables
+            parent_columns: List[Column] = []
+            child_columns: List[Column] = []
+            for parent_ref, child_ref in raw_reference.joins:
+                parent_columns.append(resolve(columns_by_id, parent_ref, reference_id))
+                child_columns.append(resolve(columns_by_id, child_ref, reference_id))
 
-    def parse_sequences(self):
-        seq_nodes = find_nodes(self.root, 'o:RootObject/c:Children/o:Model/c:Sequences/o:Sequence')
-        sequences: List[Sequence] = []
+            if any(c is None for c in parent_columns + child_columns):
+                continue
 
-        for seq_node in seq_nodes:
-            seq_code = find_text(seq_node, 'a:Code')
-            sequences.append(Sequence(seq_code))
+            if len(child_columns) == 0:
+                continue
 
-        # sort by code
-        sequences.sort(key=lambda t: t.code)
+            reference = Reference(id=reference_id, code=code, name=name, parent_table=parent_table.code,
+                                  child_table=child_table.code, parent_columns=tuple(parent_columns),
+                                  child_columns=tuple(child_columns))
+            references.append(reference)
 
-        return sequences
+        return references
 
-    def find_column_node(self, node_id: str) -> Optional[Element]:
-        nodes = find_nodes(
-            self.root,
-            "o:RootObject/c:Children/o:Model/c:Tables/o:Table/c:Columns/o:Column[@Id='{}']".format(node_id))
-        if nodes and len(nodes) > 0:
-            return nodes[0]
-        else:
+    @staticmethod
+    def compile_globs(globs: Optional[List[str]]):
+        if not globs:
             return None
+        return re.compile('|'.join(fnmatch.translate(glob) for glob in globs), re.IGNORECASE)
@@ -0,0 +1,184 @@
+import datetime
+from typing import List, Optional
+
+from .models import Column, Table
+from .typemapping import TypeMapping
+
+
+# Render DDL and entity definitions of tables.
+# Column types are resolved by the caller, so they can be converted once for several targets
+class Renderer:
+    @staticmethod
+    def column_types(table: Table, source_db: str, target_db: str) -> List[str]:
+        """
+        :return: Data types of the table columns, converted to the target database/language
+        """
+        return [TypeMapping.convert(source_db, target_db, str(c.data_type)) for c in table.columns]
+
+    @staticmethod
+    def render_mysql(table: Table, column_types: List[str], foreign_keys: bool = False) -> str:
+        """
+        :param table: Table to generate DDL for
+        :param column_types: MySQL data types of the table columns, see :meth:`column_types`
+        :param foreign_keys: Whether to add foreign key constraints. The referenced tables must be created first
+        """
+        result = ''
+        result += 'CREATE TABLE `{}` (\n'.format(table.code)
+        for column, column_type in zip(table.columns, column_types):
+            result += '  `{}` {}'.format(column.code, column_type)
+            if column.required:
+                result += ' NOT NULL'
+            if column.name:
+                result += " COMMENT '{}'".format(column.name)
+            result += ',\n'
+
+        if table.primary_key:
+            result += '  PRIMARY KEY ({}),\n'.format(Renderer.quote_columns(table.primary_key.columns, '`'))
+
+        for key in table.keys:
+            result += '  UNIQUE KEY `{}`({}),\n'.format(key.code, Renderer.quote_columns(key.columns, '`'))
+
+        for index in table.indexes:
+            result += '  {}KEY `{}`({}),\n'.format('UNIQUE ' if index.unique else '', index.code,
+                                                   Renderer.quote_columns(index.columns, '`'))
+
+        for reference in table.references if foreign_keys else ():
+            result += '  CONSTRAINT `{}` FOREIGN KEY ({}) REFERENCES `{}`({}),\n'.format(
+                reference.code,
+                Renderer.quote_columns(reference.child_columns, '`'),
+                reference.parent_table,
+                Renderer.quote_columns(reference.parent_columns, '`'))
+
+        result = result.rstrip(',\n') + '\n)'
+
+        if table.name:
+            result += " COMMENT '{}'".format(table.name)
+        result += ';'
+
+        return result
+
+    @staticmethod
+    def render_oracle(table: Table, column_types: List[str], foreign_keys: bool = False) -> str:
+        """
+        :param table: Table to generate DDL for
+        :param column_types: Oracle data types of the table columns, see :meth:`column_types`
+        :param foreign_keys: Whether to add foreign key constraints. The referenced tables must be created first
+        """
+        result = ''
+        result += 'CREATE TABLE "{}" (\n'.format(table.code)
+        for column, column_type in zip(table.columns, column_types):
+            result += '  "{}" {}'.format(column.code, column_type)
+            if column.required:
+                result += ' NOT NULL'
+            result += ',\n'
+
+        if table.primary_key:
+            result += '  CONSTRAINT "{}" PRIMARY KEY ({}),\n'.format(
+                table.primary_key.code,
+                Renderer.quote_columns(table.primary_key.columns, '"'))
+
+        if len(table.keys) > 0:
+            for key in table.keys:
+                result += '  CONSTRAINT "{}" UNIQUE ({}),\n'.format(key.code,
+                                                                    Renderer.quote_columns(key.columns, '"'))
+
+        for reference in table.references if foreign_keys else ():
+            result += '  CONSTRAINT "{}" FOREIGN KEY ({}) REFERENCES "{}"({}),\n'.format(
+                reference.code,
+                Renderer.quote_columns(reference.child_columns, '"'),
+                reference.parent_table,
+                Renderer.quote_columns(reference.parent_columns, '"'))
+
+        result = result.rstrip(',\n') + '\n);\n\n'
+
+        if table.name:
+            result += 'COMMENT ON TABLE "{}" IS \'{}\';\n'.format(table.code, table.name)
+        for c in table.columns:
+            if c.name:
+                result += 'COMMENT ON COLUMN "{}"."{}" IS \'{}\';\n'.format(table.code, c.code, c.name)
+
+        if len(table.indexes) > 0:
+            for index in table.indexes:
+                result += 'CREATE {}INDEX "{}" ON "{}"({});\n'.format(
+                    'UNIQUE ' if index.unique else '',
+                    index.code,
+                    table.code,
+                    Renderer.quote_columns(index.columns, '"'))
+
+        result = result.rstrip()
+        return result
+
+    @staticmethod
+    def render_java(table: Table, column_types: List[str], package: str = 'com.example',
+                    since: Optional[str] = None) -> str:
+        """
+        :param table: Table to generate entity for
+        :param column_types: Java types of the table columns, see :meth:`column_types`
+        :param package: Java package of the entity
+        :param since: Value of the @since tag. Default today
+        """
+        upper_camel_case = Renderer.upper_camel_case
+
+        def camel_case(word: str):
+            word = upper_camel_case(word)
+            return word[0].lower() + word[1:]
+
+        # Only support primary key with only one column
+        primary_key_column: Optional[str] = None
+        if table.primary_key and len(table.primary_key.columns) == 1:
+            primary_key_column = table.primary_key.columns[0].name
+
+        result = ''
+        package_str = 'package {};'.format(package)
+        imports = {'lombok.Data', 'javax.persistence.Table', 'java.io.Serializable'}
+
+        since = since or datetime.date.today().isoformat()
+        result += '/**\n'
+        if table.name:
+            result += ' * {}\n *\n'.format(table.name)
+        result += ' * @since {}\n'.format(since)
+        result += ' */\n'
+
+        # Use Lombok annotations
+        result += '@Data\n'
+        result += '@Table(name = "{}")\n'.format(table.code)
+        result += 'public class {} implements Serializable {{\n'.format(upper_camel_case(table.code))
+        result += '  private static final long serialVersionUID = 1L;\n\n'
+
+        for c, java_type in zip(table.columns, column_types):
+            if c.name:
+                result += '  /** {} */\n'.format(c.name)
+            if primary_key_column == c.name:
+                imports.add('javax.persistence.Id')
+                result += '  @Id\n'
+            if java_type == 'Date':
+                imports.add('java.util.Date')
+            result += '  private {} {};\n'.format(java_type, camel_case(c.code))
+
+        result += '}'
+        result = result.rstrip()
+
+        imports_list = list(imports)
+        imports_list.sort()
+        normal_imports = [p for p in imports_list if not p.startswith('java.') and not p.startswith('javax.')]
+        java_imports = [p for p in imports_list if p.startswith('java.')]
+        javax_imports = [p for p in imports_list if p.startswith('javax.')]
+        imports_str = '\n'.join(['import ' + p + ';' for p in normal_imports]) + '\n\n' + \
+                      '\n'.join(['import ' + p + ';' for p in javax_imports]) + '\n' + \
+                      '\n'.join(['import ' + p + ';' for p in java_imports])
+
+        result = package_str + '\n\n' + imports_str + '\n\n' + result
+
+        return result
+
+    @staticmethod
+    def upper_camel_case(word: str) -> str:
+        return ''.join(x.capitalize() or '_' for x in word.split('_'))
+
+    @staticmethod
+    def quote_columns(columns: List[Column], quote: str):
+        if len(columns) == 0:
+            return ''
+        else:
+            result = '`' + '`, `'.join([c.code for c in columns]) + '`'
+            return result.replace('`', quote)
@@ -0,0 +1,272 @@
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import source
+from .backends import backends
+from .models import Key, Schema, Table
+from .parser import PDMParser
+from .suggest import build_indexes, table_suggestions
+from .tablestore import TableStore
+
+targets = ('mysql', 'oracle', 'java')
+
+
+def table_summary(table: Table) -> dict:
+    return {'code': table.code, 'name': table.name, 'comment': table.comment}
+
+
+def key_detail(key: Key) -> dict:
+    return {'code': key.code, 'name': key.name, 'columns': [c.code for c in key.columns]}
+
+
+def table_detail(table: Table) -> dict:
+    return {
+        'code': table.code,
+        'name': table.name,
+        'comment': table.comment,
+        'columns': [{'code': c.code, 'name': c.name, 'type': str(c.data_type), 'required': c.required,
+                     'comment': c.comment} for c in table.columns],
+        'primary_key': key_detail(table.primary_key) if table.primary_key else None,
+        'keys': [key_detail(k) for k in table.keys],
+        'indexes': [{'code': i.code, 'name': i.name, 'unique': i.unique, 'columns': [c.code for c in i.columns]}
+                    for i in table.indexes],
+        'references': [{'code': r.code, 'name': r.name, 'parent_table': r.parent_table,
+                        'parent_columns': [c.code for c in r.parent_columns],
+                        'child_columns': [c.code for c in r.child_columns]} for r in table.references],
+    }
+
+
+class SchemaService:
+    """
+    Answers requests for one schema. Content hashes of tables are computed on first use and kept, so conditional
+    requests are answered without rendering anything.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.table_hashes: Dict[str, str] = {}
+
+    def table_hash(self, table: Table) -> str:
+        result = self.table_hashes.get(table.code)
+        if result is None:
+            # The source database is part of the content, as it changes the DDL
+            content = json.dumps([self.schema.db, table_detail(table)], ensure_ascii=False, sort_keys=True)
+            result = self.table_hashes[table.code] = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return result
+
+    @staticmethod
+    def combine_hashes(parts: Iterable[str]) -> str:
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def tables_etag(self, tables: List[Table]) -> str:
+        return self.combine_hashes(['tables'] + [self.table_hash(t) for t in tables])
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints:
+
+    * GET /: DB type, table and sequence counts
+    * GET /tables[?glob=PATTERN]: Table list
+    * GET /tables/TABLE: Table definition
+    * GET /tables/TABLE/ddl/TARGET: DDL (mysql/oracle) or entity definition (java) of the table, as plain text
+    * GET /sequences[?glob=PATTERN]: Sequence codes
+
+    HEAD is supported on all of them.
+    """
+
+    service: SchemaService  # set on the subclass created by create_server
+    protocol_version = 'HTTP/1.1'
+
+    table_path_pattern = re.compile(r'/tables/([^/]+)')
+    ddl_path_pattern = re.compile(r'/tables/([^/]+)/ddl/([^/]+)')
+
+    head_only = False  # HEAD request, send headers only
+
+    def do_HEAD(self):
+        # The handler serves all requests of a keep-alive connection
+        self.head_only = True
+        try:
+            self.do_GET()
+        finally:
+            self.head_only = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = unquote(url.path).rstrip('/') or '/'
+        glob = parse_qs(url.query).get('glob', [None])[0]
+        schema = self.service.schema
+
+        if path == '/':
+            self.send_json({'db': schema.db, 'tables': len(schema.tables), 'sequences': len(schema.sequences)})
+            return
+
+        if path == '/tables':
+            tables = self.find_tables(glob)
+            if tables is not None:
+                self.send_json([table_summary(t) for t in tables], lambda: self.service.tables_etag(tables))
+            return
+
+        if path == '/sequences':
+            try:
+                sequences = schema.find_sequences(glob) if glob else schema.sequences
+            except re.error:
+                self.send_error_json(HTTPStatus.BAD_REQUEST, 'Invalid glob: ' + glob)
+                return
+            codes = [s.code for s in sequences]
+            self.send_json(codes, lambda: self.service.combine_hashes(['sequences'] + codes))
+            return
+
+        m = self.table_path_pattern.fullmatch(path)
+        if m:
+            table = self.get_table(m.group(1))
+            if table:
+                self.send_json(table_detail(table), lambda: self.service.table_hash(table))
+            return
+
+        m = self.ddl_path_pattern.fullmatch(path)
+        if m:
+            target = m.group(2)
+            if target not in targets:
+                self.send_error_json(HTTPStatus.NOT_FOUND, 'Unknown target: ' + target)
+                return
+            table = self.get_table(m.group(1))
+            if table:
+                etag_parts = [self.service.table_hash(table), target]
+                # Java entities are tagged with the date they are generated, so they change every day
+                since = None
+                if target == 'java':
+                    since = datetime.date.today().isoformat()
+                    etag_parts.append(since)
+                self.send_content(lambda: schema.render_ddl(table, target, since=since).encode('utf-8'),
+                                  'text/plain; charset=utf-8', self.service.combine_hashes(etag_parts))
+            return
+
+        self.send_error_json(HTTPStatus.NOT_FOUND, 'Not found: ' + path)
+
+    def find_tables(self, glob: Optional[str]) -> Optional[List[Table]]:
+        if not glob:
+            return list(self.service.schema.tables)
+        try:
+            return self.service.schema.find_tables(glob)
+        except re.error:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, 'Invalid glob: ' + glob)
+            return None
+
+    def get_table(self, code: str) -> Optional[Table]:
+        table = self.service.schema.get_table(code)
+        if not table:
+            self.send_error_json(HTTPStatus.NOT_FOUND, 'Table not found: ' + code,
+                                 suggestions=table_suggestions(self.service.schema, code))
+        return table
+
+    def send_json(self, data, etag=None):
+        """
+        :param etag: Function computing the ETag of the data, without quotes
+        """
+        self.send_content(lambda: json.dumps(data, ensure_ascii=False).encode('utf-8'),
+                          'application/json; charset=utf-8', etag() if etag else None)
+
+    def send_content(self, body, content_type: str, etag: Optional[str]):
+        """
+        :param body: Function producing the body. Not called if the client has the current version
+        :param etag: ETag of the content, without quotes
+        """
+        quoted_etag = '"{}"'.format(etag) if etag else None
+        if quoted_etag and self.etag_matches(quoted_etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', quoted_etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+
+        content = body()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if quoted_etag:
+            self.send_header('ETag', quoted_etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(content)
+
+    def etag_matches(self, quoted_etag: str) -> bool:
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        for tag in header.split(','):
+            tag = tag.strip()
+            # Weak comparison, as for GET requests
+            if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == quoted_etag:
+                return True
+        return False
+
+    def send_error_json(self, status: HTTPStatus, message: str, **details):
+        content = json.dumps(dict(error=message, **details), ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(content)
+
+
+def create_server(schema: Schema, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Create a server for the schema, handling each connection in its own thread. Call serve_forever() to run it.
+
+    :param port: Port to listen on. 0 for any free port, see server_address of the result
+    """
+    handler = type('SchemaRequestHandler', (RequestHandler,), {'service': SchemaService(schema)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(prog='pdmreader http', description='Serve a PDM file as JSON over HTTP')
+    parser.add_argument('file', help='PDM file. May be compressed (gzip/bzip2/xz), or ARCHIVE.zip!MEMBER.pdm')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on. Default: 127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on. Default: 8000')
+    parser.add_argument('--backend', choices=list(backends),
+                        help='XML parser backend. Default: {}'.format(next(iter(backends))))
+    parser.add_argument('--only', action='append', metavar='GLOB',
+                        help='Only load tables matching the glob. May be repeated')
+    parser.add_argument('--exclude', action='append', metavar='GLOB',
+                        help='Do not load tables matching the glob. May be repeated')
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help='Keep tables in a temporary file instead of memory, holding only recently used tables '
+                             'in memory, up to about MB megabytes')
+    args = parser.parse_args(argv)
+
+    if not source.exists(args.file):
+        print("File not found: " + args.file, file=sys.stderr)
+        return
+
+    store = TableStore(args.max_memory * 1024 * 1024) if args.max_memory else None
+    try:
+        schema = PDMParser(args.file, args.backend, True, args.only, args.exclude, store).parse()
+    except (FileNotFoundError, source.SourceError) as e:
+        print(e, file=sys.stderr)
+        return
+    build_indexes(schema)
+    server = create_server(schema, args.host, args.port)
+    host, port = server.server_address[:2]
+    print('Serving {} on http://{}:{}/'.format(args.file, host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
@@ -0,0 +1,235 @@
+import io
+import json
+import os
+from typing import Dict, List, Optional
+from xml.parsers import expat
+from xml.sax.saxutils import escape, quoteattr
+
+from . import source
+from .backends.expat import CHUNK_SIZE, MODEL_PATH, OBJECT_DEPTH, namespace_prefixes
+from .models import Schema
+from .parser import PDMParser
+
+# Index file, next to the PDM file
+INDEX_SUFFIX = '.pdmidx'
+INDEX_VERSION = 2
+
+# Namespace URIs of the element prefixes used in PDM files
+namespace_uris = {prefix: uri for uri, prefix in namespace_prefixes.items()}
+
+
+class _IndexBuilder:
+    """
+    Record byte ranges of tables in one pass over the file, without collecting anything else.
+    A range starts at the start tag and ends at the start of the end tag.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.stack: List[str] = []
+        self.tags: Dict[str, str] = {}
+        self.encoding = 'UTF-8'
+        self.namespaces: Dict[str, str] = {}  # prefix ('' for default) -> URI
+        self.target_model: Optional[str] = None
+        self.tables: Dict[str, List[list]] = {}  # code -> [[start, end]]
+        self.kind: Optional[str] = None
+        self.current: Optional[dict] = None
+        self.text: Optional[List[str]] = None
+
+    def tag(self, name: str) -> str:
+        tag = self.tags.get(name)
+        if tag is None:
+            uri, _, local = name.rpartition(' ')
+            prefix = namespace_prefixes.get(uri)
+            tag = prefix + ':' + local if prefix else local
+            self.tags[name] = tag
+        return tag
+
+    def xml_declaration(self, version: str, encoding: Optional[str], standalone: int):
+        if encoding:
+            self.encoding = encoding
+
+    def namespace_declaration(self, prefix: Optional[str], uri: str):
+        self.namespaces.setdefault(prefix or '', uri)
+
+    def start(self, name: str, attrs: Dict[str, str]):
+        stack = self.stack
+        stack.append(self.tag(name))
+        depth = len(stack)
+
+        if depth == OBJECT_DEPTH and tuple(stack[1:OBJECT_DEPTH - 2]) == MODEL_PATH:
+            collection = (stack[-2], stack[-1])
+            if collection == ('c:Tables', 'o:Table'):
+                self.kind = 'table'
+            elif collection == ('c:TargetModels', 'o:TargetModel') and self.target_model is None:
+                self.kind = 'target_model'
+            else:
+                return
+            self.current = {'start': self.parser.CurrentByteIndex}
+            return
+
+        if self.kind is None or depth <= OBJECT_DEPTH:
+            return
+        path = tuple(stack[OBJECT_DEPTH:])
+        if (self.kind == 'table' and path == ('a:Code',)) or (self.kind == 'target_model' and path == ('a:Name',)):
+            self.text = []
+
+    def end(self, name: str):
+        if self.text is not None:
+            self.current['text'] = ''.join(self.text).strip()
+            self.text = None
+        elif self.kind is not None and len(self.stack) == OBJECT_DEPTH:
+            self.end_object()
+        self.stack.pop()
+
+    def data(self, data: str):
+        if self.text is not None:
+            self.text.append(data)
+
+    def end_object(self):
+        current = self.current
+        end = self.parser.CurrentByteIndex
+        if self.kind == 'table':
+            code = current.get('text', '').lower()
+            self.tables.setdefault(code, []).append([current['start'], end])
+        elif self.kind == 'target_model':
+            self.target_model = current.get('text', '')
+        self.kind = None
+        self.current = None
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def build_index(path: str) -> Optional[dict]:
+    """
+    Index byte ranges of the tables of an uncompressed PDM file, and write the index next to it.
+    The index is still returned if it cannot be written.
+
+    :return: The index. None if the file cannot be indexed
+    """
+    stat = os.stat(path)
+    parser = expat.ParserCreate(namespace_separator=' ')
+    builder = _IndexBuilder(parser)
+    parser.buffer_text = True
+    parser.XmlDeclHandler = builder.xml_declaration
+    parser.StartNamespaceDeclHandler = builder.namespace_declaration
+    parser.StartElementHandler = builder.start
+    parser.EndElementHandler = builder.end
+    parser.CharacterDataHandler = builder.data
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.Parse(chunk, False)
+        parser.Parse(b'', True)
+
+    # Fragments are copied as bytes into a document with ASCII markup
+    if builder.encoding.lower().replace('-', '').startswith(('utf16', 'utf32')):
+        return None
+
+    index = {
+        'version': INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'encoding': builder.encoding,
+        'namespaces': builder.namespaces,
+        'target_model': builder.target_model or '',
+        'tables': builder.tables,
+    }
+    try:
+        with open(index_path(path), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    except OSError:
+        pass
+    return index
+
+
+def read_index(path: str) -> Optional[dict]:
+    """
+    :return: Index of the file. None if there is none, or the file changed since it was built
+    """
+    try:
+        with open(index_path(path), encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(path)
+    if index.get('version') != INDEX_VERSION or index.get('size') != stat.st_size or \
+            index.get('mtime_ns') != stat.st_mtime_ns:
+        return None
+    return index
+
+
+def read_range(f, start: int, end: int) -> bytes:
+    # The range ends at the start of the end tag. Read up to the end of the end tag
+    f.seek(start)
+    content = f.read(end - start)
+    tail = b''
+    while b'>' not in tail:
+        chunk = f.read(64)
+        if not chunk:
+            raise Exception('Unexpected end of file, the index may be outdated')
+        tail += chunk
+    return content + tail[:tail.index(b'>') + 1]
+
+
+def synthesize_document(index: dict, tables: List[bytes]) -> bytes:
+    """
+    Wrap table elements into a minimal PDM document, using the namespace prefixes of the file.
+    """
+    prefixes = {uri: prefix for prefix, uri in reversed(list(index['namespaces'].items()))}
+
+    def tag(name: str) -> str:
+        # "o:Model" -> tag with the prefix the file uses for the namespace
+        prefix, local = name.split(':')
+        file_prefix = prefixes.get(namespace_uris[prefix], prefix)
+        return file_prefix + ':' + local if file_prefix else local
+
+    declarations = ' '.join('xmlns{}={}'.format(':' + prefix if prefix else '', quoteattr(uri))
+                            for prefix, uri in index['namespaces'].items())
+    head = '<?xml version="1.0" encoding="{}"?>\n<Model {}>'.format(index['encoding'], declarations)
+    for name in MODEL_PATH:
+        head += '<{}>'.format(tag(name))
+    head += '<{0}><{1}><{2}>{3}</{2}></{1}></{0}>'.format(tag('c:TargetModels'), tag('o:TargetModel'),
+                                                        tag('a:Name'), escape(index['target_model']))
+
+    encoding = index['encoding']
+    parts = [head.encode(encoding, 'xmlcharrefreplace'), '<{}>'.format(tag('c:Tables')).encode(encoding)]
+    parts += tables
+    tail = '</{}>'.format(tag('c:Tables'))
+    for name in reversed(MODEL_PATH):
+        tail += '</{}>'.format(tag(name))
+    parts.append((tail + '</Model>').encode(encoding))
+    return b''.join(parts)
+
+
+def load_table(path: str, code: str, backend: Optional[str] = None, strict: bool = True) -> Optional[Schema]:
+    """
+    Load a single table by parsing only its part of the file. The table has no foreign keys: single table commands
+    do not render them. The index is built on first use and rebuilt when the file changes.
+
+    :param path: PDM file path. Only uncompressed files are indexed
+    :param code: Table code
+    :return: Schema with the table, and no references or sequences. None if the file cannot be indexed or has no
+        table with the code
+    """
+    if not source.is_plain(path):
+        return None
+
+    index = read_index(path) or build_index(path)
+    if index is None:
+        return None
+
+    entries = index['tables'].get(code.lower())
+    if not entries:
+        return None
+
+    with open(path, 'rb') as f:
+        tables = [read_range(f, start, end) for start, end in entries]
+
+    document = synthesize_document(index, tables)
+    return PDMParser(path, backend, strict).parse_document(io.BytesIO(document))
@@ -0,0 +1,110 @@
+import bz2
+import gzip
+import lzma
+import os.path
+import zipfile
+from typing import BinaryIO, List, Optional, Tuple
+
+# Separates a zip archive from the member to read, e.g. models.zip!order.pdm
+ARCHIVE_SEPARATOR = '!'
+
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Compression formats detected by magic bytes, not file extension
+decompressors = [
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+]
+
+
+class SourceError(ValueError):
+    """
+    The path does not tell which PDM file to read, such as a zip archive of several files without a member name.
+    """
+
+    def __init__(self, message: str, candidates: Optional[List[str]] = None):
+        """
+        :param candidates: Files the path may have meant
+        """
+        super().__init__(message)
+        self.candidates = candidates or []
+
+
+def split_path(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a path like "archive.zip!member.pdm" into the archive path and the member name.
+
+    :return: File path and member name. Member name is None if the path does not point into an archive
+    """
+    if os.path.exists(path) or ARCHIVE_SEPARATOR not in path:
+        return path, None
+
+    file, member = path.split(ARCHIVE_SEPARATOR, 1)
+    return file, member
+
+
+def exists(path: str) -> bool:
+    return os.path.isfile(split_path(path)[0])
+
+
+def is_plain(path: str) -> bool:
+    """
+    :return: Whether the path is an uncompressed file, which can be read at any offset
+    """
+    file, member = split_path(path)
+    if member is not None:
+        return False
+    with open(file, 'rb') as f:
+        magic = f.read(8)
+    return not magic.startswith(ZIP_MAGIC) and not any(magic.startswith(prefix) for prefix, _ in decompressors)
+
+
+def open_pdm(path: str) -> BinaryIO:
+    """
+    Open a PDM file for reading. Compressed files and zip archive members are decompressed on the fly while
+    being read, without temporary files.
+
+    :param path: Path to a PDM file, a compressed PDM file, or "archive.zip!member.pdm"
+    :return: Binary stream of the uncompressed PDM content
+    :raise FileNotFoundError: If there is no such file, or no such member in the archive
+    :raise SourceError: If the path is a zip archive of several files, without a member name
+    """
+    file, member = split_path(path)
+    with open(file, 'rb') as f:
+        magic = f.read(8)
+
+    if magic.startswith(ZIP_MAGIC):
+        return open_zip_member(file, member)
+
+    if member is not None:
+        raise FileNotFoundError('Not a zip archive: ' + file)
+
+    for prefix, opener in decompressors:
+        if magic.startswith(prefix):
+            return opener(file, 'rb')
+
+    return open(file, 'rb')
+
+
+def open_zip_member(file: str, member: Optional[str]) -> BinaryIO:
+    # The member stream keeps the archive file open until the stream itself is closed
+    with zipfile.ZipFile(file) as archive:
+        if member is None:
+            names = [n for n in archive.namelist() if not n.endswith('/')]
+            pdm_names = [n for n in names if n.lower().endswith('.pdm')]
+            if len(pdm_names) == 1:
+                member = pdm_names[0]
+            elif len(names) == 1:
+                member = names[0]
+            elif len(names) == 0:
+                raise FileNotFoundError('Empty zip archive: ' + file)
+            else:
+                candidates = pdm_names or names
+                raise SourceError('Multiple files in zip archive, specify one with {}{}MEMBER: {}'.format(
+                    file, ARCHIVE_SEPARATOR, ', '.join(candidates)), candidates)
+
+        try:
+            return archive.open(member)
+        except KeyError:
+            raise FileNotFoundError('File not found in zip archive: {}{}{}'.format(file, ARCHIVE_SEPARATOR, member))
@@ -0,0 +1,118 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import chain
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .models import Schema
+
+MAX_SUGGESTIONS = 5
+# Minimum similarity (Dice coefficient of trigram sets) of a suggestion
+MIN_SIMILARITY = 0.3
+# Number of entries sharing the most trigrams, per suggestion, scored by trigram similarity
+CANDIDATE_FACTOR = 50
+# Number of best trigram matches, per suggestion, re-ranked by edit similarity
+RERANK_FACTOR = 4
+
+
+def trigrams(text: str) -> Set[str]:
+    # Padded, so that short texts have trigrams and the beginning of a text weighs more
+    text = '  ' + text.lower() + ' '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to texts, for finding texts similar to a misspelled one without comparing
+    it to every text.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        """
+        :param entries: (text to match, value to suggest). Several texts may suggest the same value
+        """
+        self.texts: List[str] = []
+        self.values: List[str] = []
+        self.sizes: List[int] = []  # number of trigrams of each entry
+        self.postings: Dict[str, List[int]] = {}
+        for text, value in entries:
+            if not text:
+                continue
+            entry = len(self.values)
+            self.texts.append(text.lower())
+            self.values.append(value)
+            grams = trigrams(text)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(entry)
+
+    def suggest(self, text: str, limit: int = MAX_SUGGESTIONS) -> List[str]:
+        """
+        :return: Values of the entries most similar to the text, most similar first
+        """
+        grams = trigrams(text)
+        # Number of trigrams shared with each entry having at least one
+        shared = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in grams))
+
+        # value -> (score, entry)
+        best: Dict[str, Tuple[float, int]] = {}
+        for entry, count in shared.most_common(limit * CANDIDATE_FACTOR):
+            score = 2 * count / (len(grams) + self.sizes[entry])
+            value = self.values[entry]
+            if score >= MIN_SIMILARITY and score > best.get(value, (0, 0))[0]:
+                best[value] = (score, entry)
+
+        # Trigram scores tie often for codes differing in one character. Break ties with edit similarity, only
+        # computed for the few best candidates
+        candidates = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit * RERANK_FACTOR]
+        text = text.lower()
+
+        def rank(item):
+            value, (score, entry) = item
+            return -(score + SequenceMatcher(None, text, self.texts[entry]).ratio()), value
+
+        return [value for value, _ in sorted(candidates, key=rank)[:limit]]
+
+
+def table_index(schema: Schema) -> TrigramIndex:
+    """
+    Index of table codes and names. Built on first use, and cached on the schema.
+    """
+    index = schema.cache.get('table_index')
+    if index is None:
+        names = schema.table_names()
+        index = schema.cache['table_index'] = TrigramIndex(
+            chain(((code, code) for code, _ in names), ((name, code) for code, name in names)))
+    return index
+
+
+def sequence_index(schema: Schema) -> TrigramIndex:
+    """
+    Index of sequence codes. Built on first use, and cached on the schema.
+    """
+    index = schema.cache.get('sequence_index')
+    if index is None:
+        index = schema.cache['sequence_index'] = TrigramIndex((s.code, s.code) for s in schema.sequences)
+    return index
+
+
+def build_indexes(schema: Schema):
+    """
+    Build the indexes of the schema at once, so that suggestions are found in milliseconds from the first unknown
+    name on. Used when loading the schema for an interactive or HTTP session.
+    """
+    table_index(schema)
+    sequence_index(schema)
+
+
+def table_suggestions(schema: Schema, name: str) -> List[str]:
+    """
+    Codes of tables whose code or name is similar to the given name.
+    """
+    return table_index(schema).suggest(name)
+
+
+def sequence_suggestions(schema: Schema, name: str) -> List[str]:
+    """
+    Codes of sequences similar to the given name.
+    """
+    return sequence_index(schema).suggest(name)
@@ -0,0 +1,247 @@
+import dataclasses
+import io
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import DataType, Reference, Table, TableSequence
+
+# Estimated memory used by a loaded table, per byte of its stored form
+MEMORY_PER_STORED_BYTE = 6
+
+# Tables inserted per statement while building
+INSERT_BATCH_SIZE = 500
+
+# Maximum number of parameters of a SQLite statement, in older SQLite versions
+MAX_PARAMETERS = 999
+
+
+class _TablePickler(pickle.Pickler):
+    # Store data types by value, so that tables loaded later share them again, see TableParser.get_data_type
+    def persistent_id(self, obj):
+        if type(obj) is DataType:
+            return obj.name, obj.length, obj.precision, obj.scale
+        return None
+
+
+class _TableUnpickler(pickle.Unpickler):
+    def __init__(self, file, data_types: Dict[tuple, DataType]):
+        super().__init__(file)
+        self.data_types = data_types
+
+    def persistent_load(self, pid):
+        data_type = self.data_types.get(pid)
+        if data_type is None:
+            data_type = self.data_types[pid] = DataType(*pid)
+        return data_type
+
+
+def _remove_store(connection: sqlite3.Connection, path: str):
+    connection.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _TablesByCode(Mapping):
+    # Lookup of stored tables by code, loading only the table asked for
+    def __init__(self, store: 'TableStore'):
+        self.store = store
+
+    def __getitem__(self, code: str) -> Table:
+        position = self.store.positions.get(code)
+        if position is None:
+            raise KeyError(code)
+        return self.store[position]
+
+    def __contains__(self, code) -> bool:
+        return code in self.store.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.positions)
+
+    def __len__(self) -> int:
+        return len(self.store.positions)
+
+
+class TableStore(TableSequence):
+    """
+    Tables kept in a SQLite file instead of memory, usable as :attr:`pdmreader.models.Schema.tables`.
+
+    Tables are stored pickled, sorted by code. Only recently used tables stay loaded, as long as their estimated
+    size stays under the memory limit. Codes and names of all tables are kept in memory, so looking up and matching
+    codes, or listing names, does not load any table.
+
+    A store is built by adding tables with :meth:`add` and their foreign keys with :meth:`add_references`, then
+    calling :meth:`finish`. It is read only once finished, so it may be shared between threads, and pickled to be
+    opened again in worker processes.
+    """
+
+    def __init__(self, memory_limit: int, path: Optional[str] = None):
+        """
+        :param memory_limit: Estimated size in bytes of the tables kept loaded
+        :param path: SQLite file to create. Default a temporary file, removed when the store is garbage collected
+        """
+        self.memory_limit = memory_limit
+        temporary = path is None
+        if temporary:
+            fd, path = tempfile.mkstemp(prefix='pdmreader-', suffix='.sqlite')
+            os.close(fd)
+        elif os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute('CREATE TABLE tables (code TEXT NOT NULL, id TEXT NOT NULL, name TEXT NOT NULL, '
+                                'data BLOB NOT NULL)')
+        self.connection.execute('CREATE INDEX tables_id ON tables (id)')
+        # Foreign keys are found after all tables, they are attached to tables when loaded
+        self.connection.execute('CREATE TABLE table_references (code TEXT PRIMARY KEY, data BLOB NOT NULL)')
+        if temporary:
+            weakref.finalize(self, _remove_store, self.connection, path)
+        self.init()
+
+    @classmethod
+    def open(cls, path: str, memory_limit: int) -> 'TableStore':
+        """
+        Open a finished store read only.
+        """
+        store = cls.__new__(cls)
+        store.memory_limit = memory_limit
+        store.path = path
+        store.connection = sqlite3.connect('file:{}?mode=ro'.format(path), uri=True, check_same_thread=False)
+        store.init()
+        store.finish()
+        return store
+
+    def init(self):
+        self.lock = threading.RLock()
+        self.pending: List[Tuple[str, str, str, bytes]] = []  # rows not inserted yet
+        self.codes: List[str] = []  # sorted
+        self.names: List[str] = []  # name of each code
+        self.row_ids: List[int] = []  # row id of each code
+        self.positions: Dict[str, int] = {}  # code -> position in codes
+        self.loaded: 'OrderedDict[int, Tuple[Table, int]]' = OrderedDict()  # row id -> (table, size), LRU first
+        self.loaded_size = 0
+        self.data_types: Dict[tuple, DataType] = {}
+        self.finished = False
+
+    def __reduce__(self):
+        return TableStore.open, (self.path, self.memory_limit)
+
+    def add(self, table: Table):
+        self.check_not_finished()
+        self.pending.append((table.code, table.id, table.name, self.dump(table)))
+        if len(self.pending) >= INSERT_BATCH_SIZE:
+            self.flush()
+
+    def add_references(self, code: str, references: Tuple[Reference, ...]):
+        """
+        Set the foreign keys of the tables having the code.
+        """
+        self.check_not_finished()
+        with self.lock:
+            self.connection.execute('INSERT INTO table_references (code, data) VALUES (?, ?)',
+                                    (code, self.dump(references)))
+
+    def check_not_finished(self):
+        if self.finished:
+            raise Exception('Table store is read only once finished')
+
+    def flush(self):
+        if self.pending:
+            with self.lock:
+                self.connection.executemany('INSERT INTO tables (code, id, name, data) VALUES (?, ?, ?, ?)',
+                                            self.pending)
+            self.pending = []
+
+    def finish(self):
+        """
+        Make the tables added so far available in the sequence, sorted by code.
+        """
+        self.flush()
+        with self.lock:
+            self.connection.commit()
+            rows = self.connection.execute('SELECT rowid, code, name FROM tables ORDER BY code, rowid').fetchall()
+            # Tables loaded while building lack their foreign keys
+            self.loaded.clear()
+            self.loaded_size = 0
+        self.row_ids = [row_id for row_id, _, _ in rows]
+        self.codes = [code for _, code, _ in rows]
+        self.names = [name for _, _, name in rows]
+        self.positions = {code: i for i, code in enumerate(self.codes)}
+        self.finished = True
+
+    def find_by_ids(self, ids: Iterable[str]) -> List[Table]:
+        """
+        :return: Tables having the given ids, in no particular order. Also works before :meth:`finish`, returning
+            tables without foreign keys then
+        """
+        self.flush()
+        ids = list(ids)
+        row_ids = []
+        with self.lock:
+            for i in range(0, len(ids), MAX_PARAMETERS):
+                chunk = ids[i:i + MAX_PARAMETERS]
+                row_ids += [row_id for row_id, in self.connection.execute(
+                    'SELECT rowid FROM tables WHERE id IN ({})'.format(','.join('?' * len(chunk))), chunk)]
+        return [self.load(row_id) for row_id in row_ids]
+
+    def by_code(self) -> Mapping:
+        """
+        :return: Mapping from table code to table, for :attr:`pdmreader.models.Schema.tables_by_code`
+        """
+        return _TablesByCode(self)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.load(self.row_ids[index])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TableStore) and other.path == self.path:
+            return True
+        if not isinstance(other, Sequence) or len(other) != len(self):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def load(self, row_id: int) -> Table:
+        with self.lock:
+            entry = self.loaded.get(row_id)
+            if entry is not None:
+                self.loaded.move_to_end(row_id)
+                return entry[0]
+
+            data, references = self.connection.execute(
+                'SELECT t.data, r.data FROM tables t LEFT JOIN table_references r ON r.code = t.code '
+                'WHERE t.rowid = ?', (row_id,)).fetchone()
+            table = _TableUnpickler(io.BytesIO(data), self.data_types).load()
+            size = len(data) * MEMORY_PER_STORED_BYTE
+            if references is not None:
+                table = dataclasses.replace(
+                    table, references=_TableUnpickler(io.BytesIO(references), self.data_types).load())
+                size += len(references) * MEMORY_PER_STORED_BYTE
+            self.loaded[row_id] = (table, size)
+            self.loaded_size += size
+            # Keep at least the table just loaded
+            while self.loaded_size > self.memory_limit and len(self.loaded) > 1:
+                _, (_, evicted_size) = self.loaded.popitem(last=False)
+                self.loaded_size -= evicted_size
+            return table
+
+    @staticmethod
+    def dump(value) -> bytes:
+        output = io.BytesIO()
+        _TablePickler(output, pickle.HIGHEST_PROTOCOL).dump(value)
+        return output.getvalue()
@@ -1,4 +1,6 @@
-from .base import TypeMapper
+from typing import Tuple
+
+from .base import TypeMapper, EXACT, LOSSY, UNMAPPED
 from .mysql2oracle import MySQL2OracleTypeMapper
 from .oracle2java import Oracle2JavaTypeMapper
 from .oracle2mysql import Oracle2MySQLTypeMapper
@@ -30,3 +32,19 @@ class TypeMapping:
                 return mapper.convert(data_type)
 
         return data_type
+
+    @classmethod
+    def convert_with_status(cls, source_db: str, target_db: str, data_type: str) -> Tuple[str, str]:
+        """
+        Like :meth:`convert`, also telling whether the conversion is exact, lossy or unmapped.
+
+        :return: Converted data type, and conversion status (EXACT, LOSSY or UNMAPPED)
+        """
+        if source_db == target_db:
+            return data_type, EXACT
+
+        for mapper in cls.mappers:
+            if mapper.source == source_db and mapper.target == target_db:
+                return mapper.convert(data_type), mapper.status(data_type)
+
+        return data_type, UNMAPPED
@@ -1,10 +1,17 @@
 import re
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Set
 from ..models import DataType, TypeUtil
 
+# Conversion status
+EXACT = 'exact'
+LOSSY = 'lossy'  # target type cannot hold every value, or drops some information of the source type
+UNMAPPED = 'unmapped'  # no mapping for the source type, result is a fallback or the unchanged source type
+
 
 class Converter(ABC):
+    lossy = False
+
     @abstractmethod
     def matches(self, data_type: DataType) -> bool:
         pass
@@ -13,11 +20,18 @@ class Converter(ABC):
     def convert(self, data_type: DataType) -> str:
         pass
 
+    def status(self, data_type: str) -> str:
+        """
+        :return: Conversion status of a matching data type
+        """
+        return LOSSY if self.lossy else EXACT
+
 
 class PatternConverter(Converter):
-    def __init__(self, pattern: str, replacement: str):
+    def __init__(self, pattern: str, replacement: str, lossy: bool = False):
         self.pattern = re.compile(pattern, re.IGNORECASE)
         self.replacement = replacement
+        self.lossy = lossy
 
     def matches(self, data_type: DataType) -> bool:
         return self.pattern.fullmatch(data_type) is not None
@@ -38,26 +52,47 @@ class SamePatternConverter(Converter):
 
 
 class TypeMapper(ABC):
-    def __init__(self, source: str, target: str, type_map: Dict[str, str] = None, converters: List[Converter] = None):
+    def __init__(self, source: str, target: str, type_map: Dict[str, str] = None, converters: List[Converter] = None,
+                 lossy: Set[str] = None):
         """
         :param source: Source database type
         :param target: Target database type
         :param type_map: Predefined constant type map
         :param converters: Dynamic type converters
+        :param lossy: Types in type_map whose conversion is lossy
         """
         self.source = source
         self.target = target
         self.type_map: Dict[str, str] = type_map or {}
         self.converters: List[Converter] = converters or []
+        self.lossy: Set[str] = lossy or set()
+        self.cache: Dict[str, str] = {}
 
     def convert(self, data_type: str) -> str:
         if data_type in self.type_map:
             return self.type_map[data_type]
 
+        if data_type in self.cache:
+            return self.cache[data_type]
+
+        result = data_type
         for converter in self.converters:
             if converter.matches(data_type):
                 result = converter.convert(data_type)
-                self.type_map[data_type] = result
-                return result
+                break
 
-        return data_type
+        self.cache[data_type] = result
+        return result
+
+    def status(self, data_type: str) -> str:
+        """
+        :return: Status of converting the given type, see EXACT, LOSSY and UNMAPPED
+        """
+        if data_type in self.type_map:
+            return LOSSY if data_type in self.lossy else EXACT
+
+        for converter in self.converters:
+            if converter.matches(data_type):
+                return converter.status(data_type)
+
+        return UNMAPPED
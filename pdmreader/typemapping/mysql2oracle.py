@@ -40,6 +40,7 @@ class MySQL2OracleTypeMapper(TypeMapper):
             'varchar': 'varchar2',
             'year': 'number',
         }
+        lossy = {'bit', 'enum', 'set', 'tinyblob', 'tinytext', 'varchar'}
 
         converters: List[Converter] = [
             PatternConverter(r'varchar\((\d+)\)', r'varchar2(\1)'),
@@ -47,4 +48,4 @@ class MySQL2OracleTypeMapper(TypeMapper):
             PatternConverter(r'char\((\d+)\)', r'nchar(\1)'),
             PatternConverter(r'decimal\((.*)\)', r'number(\1)'),
         ]
-        super().__init__('mysql', 'oracle', type_map, converters)
+        super().__init__('mysql', 'oracle', type_map, converters, lossy)
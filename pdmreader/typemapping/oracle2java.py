@@ -1,27 +1,36 @@
 import re
 from typing import List
 
-from .base import Converter, TypeMapper
+from .base import Converter, PatternConverter, TypeMapper, EXACT, LOSSY, UNMAPPED
 
 
 class Oracle2JavaTypeMapper(TypeMapper):
     def __init__(self):
         type_map = {
+            'char': 'String',
+            'clob': 'String',
             'date': 'Date',
             'integer': 'Integer',
             'double': 'Double',
             'double precision': 'Double',
             'int': 'Integer',
+            'long': 'String',
             'long raw': 'Blob',
+            'nchar': 'String',
+            'nclob': 'String',
             'number': 'Double',
             'real': 'Double',
             'smallint': 'Integer',
         }
+        # Oracle integer types are number(38)
+        lossy = {'number', 'integer', 'int', 'smallint'}
         converters: List[Converter] = [
+            PatternConverter(r'n?varchar2?\(\d+( byte| char)?\)', 'String'),
+            PatternConverter(r'n?char\(\d+( byte| char)?\)', 'String'),
             NumberConverter(),
             FallbackConverter(),
         ]
-        super().__init__('oracle', 'java', type_map, converters)
+        super().__init__('oracle', 'java', type_map, converters, lossy)
 
 
 class NumberConverter(Converter):
@@ -45,6 +54,9 @@ class NumberConverter(Converter):
         else:
             return 'Double'
 
+    def status(self, data_type: str) -> str:
+        return LOSSY if self.convert(data_type) == 'Double' else EXACT
+
 
 # All unknown types fallback to String
 class FallbackConverter(Converter):
@@ -53,3 +65,6 @@ class FallbackConverter(Converter):
 
     def convert(self, data_type: str) -> str:
         return 'String'
+
+    def status(self, data_type: str) -> str:
+        return UNMAPPED
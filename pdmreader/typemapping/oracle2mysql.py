@@ -1,7 +1,7 @@
 import re
 from typing import List
 
-from .base import Converter, PatternConverter, SamePatternConverter, TypeMapper
+from .base import Converter, PatternConverter, SamePatternConverter, TypeMapper, EXACT, LOSSY
 
 
 # https://docs.oracle.com/en/database/oracle/oracle-database/18/sqlrf/Data-Types.html#GUID-A3C0D836-BADB-44E5-A5D4-265BA5968483
@@ -26,21 +26,23 @@ class Oracle2MySQLTypeMapper(TypeMapper):
             'smallint': 'decimal(38)',
             'xmltype': 'longtext',
         }
+        # Oracle integer types are number(38)
+        lossy = {'bfile', 'int', 'integer', 'nclob', 'number', 'rowid'}
         converters: List[Converter] = [
             PatternConverter(r'varchar2?\((\d+)( byte)?\)', r'varchar(\1)'),
             PatternConverter(r'nvarchar2\((\d+)( byte)?\)', r'nvarchar(\1)'),
             SamePatternConverter(r'nchar varying\((\d+)\)'),
             SamePatternConverter(r'numeric\((.*)\)'),
-            PatternConverter(r'float(\(\d+\))?', 'double'),
+            PatternConverter(r'float(\(\d+\))?', 'double', lossy=True),
             NumberConverter(),
             PatternConverter(r'timestamp\((\d*)\)', r'datetime(\1)'),
-            PatternConverter(r'timestamp\((\d*)\) with time zone', r'datetime(\1)'),
-            PatternConverter(r'interval year\(\d*\) to month', 'varchar(30)'),
-            PatternConverter(r'interval day\(\d*\) to seconds?', 'varchar(30)'),
+            PatternConverter(r'timestamp\((\d*)\) with time zone', r'datetime(\1)', lossy=True),
+            PatternConverter(r'interval year\(\d*\) to month', 'varchar(30)', lossy=True),
+            PatternConverter(r'interval day\(\d*\) to seconds?', 'varchar(30)', lossy=True),
             PatternConverter(r'urowid\((\d+)\)', r'varchar(\1)'),
             RawConverter(),
         ]
-        super().__init__('oracle', 'mysql', type_map, converters)
+        super().__init__('oracle', 'mysql', type_map, converters, lossy)
 
 
 class NumberConverter(Converter):
@@ -70,6 +72,14 @@ class NumberConverter(Converter):
         else:
             return "decimal({}, {})".format(precision, scale)
 
+    def status(self, data_type: str) -> str:
+        m = self.pattern.fullmatch(data_type)
+        scale = int(m.group(2)) if m.group(2) else None
+        # number(10) and number(19) may overflow int and bigint, see convert()
+        if (scale is None or scale == 0) and int(m.group(1)) in (10, 19):
+            return LOSSY
+        return EXACT
+
 
 class CharacterConverter(Converter):
     char_pattern = re.compile(r'(?:char|character)\((\d+)\)', re.IGNORECASE)
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+from .models import Schema
+from .typemapping import TypeMapping
+
+MAX_EXAMPLES = 3
+
+
+@dataclass
+class TypeUsage:
+    data_type: str
+    count: int
+    examples: List[str]  # TABLE.COLUMN, at most MAX_EXAMPLES
+
+
+@dataclass
+class TypeConversion:
+    usage: TypeUsage
+    target_type: str
+    status: str  # see typemapping.EXACT, LOSSY and UNMAPPED
+
+
+def type_usage(schema: Schema) -> List[TypeUsage]:
+    """
+    Group all columns by data type in one pass. Cached on the schema.
+
+    :return: Distinct data types, most used first
+    """
+    if 'type_usage' not in schema.cache:
+        usages: Dict[str, TypeUsage] = {}
+        for table in schema.tables:
+            for column in table.columns:
+                data_type = str(column.data_type)
+                usage = usages.get(data_type)
+                if usage is None:
+                    usage = usages[data_type] = TypeUsage(data_type, 0, [])
+                usage.count += 1
+                if len(usage.examples) < MAX_EXAMPLES:
+                    usage.examples.append('{}.{}'.format(table.code, column.code))
+
+        schema.cache['type_usage'] = sorted(usages.values(), key=lambda u: (-u.count, u.data_type))
+    return schema.cache['type_usage']
+
+
+def type_conversions(schema: Schema, target_db: str) -> List[TypeConversion]:
+    """
+    Convert each distinct data type of the schema once. Cached on the schema per target.
+    """
+    key = 'type_conversions.' + target_db
+    if key not in schema.cache:
+        conversions: List[TypeConversion] = []
+        for usage in type_usage(schema):
+            target_type, status = TypeMapping.convert_with_status(schema.db, target_db, usage.data_type)
+            conversions.append(TypeConversion(usage, target_type, status))
+        schema.cache[key] = conversions
+    return schema.cache[key]
@@ -20,11 +20,14 @@ setup(
     long_description_content_type='text/markdown',
     long_description=long_description,
 
-    packages=['pdmreader'],
+    packages=['pdmreader', 'pdmreader.backends', 'pdmreader.typemapping'],
     include_package_data=True,
     zip_safe=True,
 
     python_requires='>= 3.7',
+    extras_require={
+        'lxml': ['lxml'],
+    },
 
     entry_points={
         'console_scripts': [
@@ -0,0 +1,60 @@
+import os
+import unittest
+
+from pdmreader.backends import backends
+from pdmreader.parser import PDMParser
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+SAMPLE = os.path.join(MODELS_DIR, 'sample.pdm')
+MALFORMED = os.path.join(MODELS_DIR, 'malformed.pdm')
+
+
+class BackendEquivalenceTest(unittest.TestCase):
+    """
+    Every parser backend must yield the same schema from the same file.
+    """
+
+    def parse_with_each_backend(self, file: str, strict: bool):
+        return {name: PDMParser(file, name, strict=strict).parse() for name in backends}
+
+    def assert_same_schema(self, file: str, strict: bool):
+        schemas = self.parse_with_each_backend(file, strict)
+        expected_name, expected = next(iter(schemas.items()))
+        for name, schema in schemas.items():
+            with self.subTest(backend=name):
+                self.assertEqual(expected, schema, '{} differs from {}'.format(name, expected_name))
+                self.assertEqual(expected.diagnostics, schema.diagnostics)
+        return expected
+
+    def test_sample(self):
+        schema = self.assert_same_schema(SAMPLE, strict=True)
+        self.assertEqual('oracle', schema.db)
+        self.assertEqual(['customer', 'order_line', 'orders'], [t.code for t in schema.tables])
+        self.assertEqual(['seq_customer', 'seq_orders'], [s.code for s in schema.sequences])
+        self.assertEqual(['fk_orders_customer', 'fk_order_line_order'], [r.code for r in schema.references])
+        self.assertEqual((), schema.diagnostics)
+
+    def test_sample_lenient(self):
+        schema = self.assert_same_schema(SAMPLE, strict=False)
+        self.assertEqual(self.assert_same_schema(SAMPLE, strict=True), schema)
+        # The reference to a shortcut is skipped
+        self.assertEqual(['external-reference'], [d.check for d in schema.diagnostics])
+
+    def test_malformed_lenient(self):
+        schema = self.assert_same_schema(MALFORMED, strict=False)
+        self.assertIn('broken', [t.code for t in schema.tables])
+        self.assertEqual(['fk_orders_customer'], [r.code for r in schema.references])
+        self.assertEqual(['unknown-data-type', 'dangling-ref', 'dangling-ref', 'dangling-ref', 'dangling-ref'],
+                         [d.check for d in schema.diagnostics])
+
+    def test_malformed_strict(self):
+        messages = {}
+        for name in backends:
+            with self.assertRaises(Exception) as context:
+                PDMParser(MALFORMED, name).parse()
+            messages[name] = str(context.exception)
+        self.assertEqual(1, len(set(messages.values())), messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import dataclasses
+import os
+import unittest
+
+from pdmreader.history import ADDED, CHANGED, REMOVED, HistoryStore, VersionExistsError, VersionOrderError
+from pdmreader.models import DataType, Schema
+from pdmreader.parser import PDMParser
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+def replace_table(schema: Schema, code: str, **changes) -> Schema:
+    tables = [dataclasses.replace(t, **changes) if t.code == code else t for t in schema.tables]
+    return dataclasses.replace(schema, tables=tables)
+
+
+class HistoryStoreTest(unittest.TestCase):
+    """
+    Deltas recorded for three versions of the sample model.
+    """
+
+    def setUp(self):
+        self.store = HistoryStore(':memory:')
+        self.addCleanup(self.store.close)
+
+        self.v1 = PDMParser(SAMPLE).parse()
+
+        # 1.1: customer comment changed, a column added to orders, amount widened, order_line removed
+        orders = self.v1.get_table('orders')
+        amount = dataclasses.replace(orders.columns[2], data_type=DataType('number', precision=12, scale=2))
+        status = dataclasses.replace(orders.columns[1], id='o29', code='status', name='status', required=False)
+        v2 = replace_table(self.v1, 'customer', comment='Customers')
+        v2 = replace_table(v2, 'orders', columns=orders.columns[:2] + (amount, orders.columns[3], status))
+        self.v2 = dataclasses.replace(v2, tables=[t for t in v2.tables if t.code != 'order_line'],
+                                      references=[r for r in v2.references if r.child_table != 'order_line'])
+
+        # 1.10: order_line back, created_at removed from orders
+        v3 = replace_table(self.v1, 'orders', columns=orders.columns[:2] + (amount, status))
+        self.v3 = replace_table(v3, 'customer', comment='Customers')
+
+        self.assertEqual((3, 10), self.store.ingest('1.0', self.v1, 'v1.pdm'))
+        self.assertEqual((3, 5), self.store.ingest('1.1', self.v2, 'v2.pdm'))
+        self.assertEqual((2, 4), self.store.ingest('1.10', self.v3, 'v3.pdm'))
+
+    def test_versions(self):
+        self.assertEqual([('1.0', 'v1.pdm'), ('1.1', 'v2.pdm'), ('1.10', 'v3.pdm')],
+                         [(name, file) for name, file, _ in self.store.versions()])
+
+    def test_table_history(self):
+        history = self.store.table_history('ORDERS')
+        self.assertEqual([('1.0', ADDED), ('1.1', CHANGED), ('1.10', CHANGED)],
+                         [(c.version, c.status) for c in history])
+        self.assertEqual(['columns'], history[1].parts)
+        self.assertEqual([('amount', CHANGED), ('status', ADDED)], history[1].columns)
+        self.assertEqual([('created_at', REMOVED)], history[2].columns)
+
+        history = self.store.table_history('customer')
+        self.assertEqual([('1.0', ADDED, []), ('1.1', CHANGED, ['comment'])],
+                         [(c.version, c.status, c.parts) for c in history])
+        self.assertEqual('Customers', history[1].comment)
+
+        history = self.store.table_history('order_line')
+        self.assertEqual([('1.0', ADDED), ('1.1', REMOVED), ('1.10', ADDED)],
+                         [(c.version, c.status) for c in history])
+        self.assertEqual([('line_no', REMOVED), ('note', REMOVED), ('order_id', REMOVED)], sorted(history[1].columns))
+
+        self.assertEqual([], self.store.table_history('nothing'))
+
+    def test_column_history(self):
+        history = self.store.column_history('orders', 'amount')
+        self.assertEqual([('1.0', ADDED, 'number(10,2)'), ('1.1', CHANGED, 'number(12,2)')],
+                         [(c.version, c.status, c.data_type) for c in history])
+
+        history = self.store.column_history('ORDERS', 'CREATED_AT')
+        self.assertEqual([('1.0', ADDED), ('1.10', REMOVED)], [(c.version, c.status) for c in history])
+        self.assertIsNone(history[1].data_type)
+
+        history = self.store.column_history('orders', 'status')
+        self.assertEqual([('1.1', ADDED, False)], [(c.version, c.status, c.required) for c in history])
+
+    def test_unchanged_version(self):
+        self.assertEqual((0, 0), self.store.ingest('1.11', self.v3))
+
+    def test_version_exists(self):
+        with self.assertRaises(VersionExistsError):
+            self.store.ingest('1.1', self.v2)
+
+    def test_version_order(self):
+        with self.assertRaises(VersionOrderError):
+            self.store.ingest('1.2', self.v2)
+        self.assertEqual(3, len(self.store.versions()))
+
+        self.store.ingest('1.2', self.v2, force=True)
+        self.assertEqual('1.2', self.store.versions()[-1][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from pdmreader import load
+from pdmreader.image import SchemaImage, to_image, write_image
+from pdmreader.renderer import Renderer
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+def render(table, db: str) -> list:
+    return [Renderer.render_mysql(table, Renderer.column_types(table, db, 'mysql'), foreign_keys=True),
+            Renderer.render_oracle(table, Renderer.column_types(table, db, 'oracle'), foreign_keys=True),
+            Renderer.render_java(table, Renderer.column_types(table, db, 'java'), since='1.0')]
+
+
+class SchemaImageTest(unittest.TestCase):
+    """
+    A schema read back from its image must render the same DDL as the parsed schema.
+    """
+
+    def setUp(self):
+        self.schema = load(SAMPLE)
+
+    def assert_same_schema(self, image: SchemaImage):
+        self.assertEqual(self.schema.db, image.db)
+        self.assertEqual([s.code for s in self.schema.sequences], image.sequences)
+        self.assertEqual([t.code for t in self.schema.tables], [t.code for t in image.tables])
+        for table, view in zip(self.schema.tables, image.tables):
+            with self.subTest(table=table.code):
+                self.assertEqual(render(table, self.schema.db), render(view, image.db))
+
+    def test_bytes(self):
+        image = SchemaImage(to_image(self.schema))
+        self.assert_same_schema(image)
+        image.close()
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sample.img')
+            write_image(self.schema, path)
+            with SchemaImage.open(path) as image:
+                self.assert_same_schema(image)
+
+    def test_get_table(self):
+        with SchemaImage(to_image(self.schema)) as image:
+            for table in self.schema.tables:
+                view = image.get_table(table.code.upper())
+                self.assertEqual(table.code, view.code)
+                self.assertEqual([r.code for r in table.references], [r.code for r in view.references])
+            self.assertIsNone(image.get_table('aaa'))
+            self.assertIsNone(image.get_table('orders_x'))
+            self.assertIsNone(image.get_table('zzz'))
+
+    def test_not_an_image(self):
+        with self.assertRaises(Exception):
+            SchemaImage(b'\0' * 1024)
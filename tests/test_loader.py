@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from pdmreader.loader import BackgroundLoader, LoadError
+
+MODELS = os.path.join(os.path.dirname(__file__), 'models')
+SAMPLE = os.path.join(MODELS, 'sample.pdm')
+
+
+class BackgroundLoaderTest(unittest.TestCase):
+    def test_table_before_schema(self):
+        loader = BackgroundLoader(SAMPLE).start()
+        orders = loader.wait_for_table('ORDERS')
+        self.assertEqual('orders', orders.code)
+        self.assertEqual('oracle', loader.wait_for_database_type())
+        self.assertIsNone(loader.wait_for_table('nothing'))
+
+        schema = loader.wait()
+        self.assertFalse(loader.loading)
+        self.assertEqual(schema.get_table('orders').columns, orders.columns)
+        self.assertEqual('oracle', loader.wait_for_database_type())
+
+    def test_failed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'truncated.pdm')
+            with open(SAMPLE, 'rb') as f, open(path, 'wb') as truncated:
+                truncated.write(f.read(200))
+            loader = BackgroundLoader(path).start()
+            loader.done.wait()
+        with self.assertRaises(LoadError):
+            loader.wait_for_table('orders')
+        with self.assertRaises(LoadError):
+            loader.wait_for_database_type()
+        self.assertTrue(loader.failed)
@@ -0,0 +1,77 @@
+import os
+import unittest
+from typing import List
+
+from pdmreader import load
+from pdmreader.models import Reference, Schema, Table
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+def table(code: str) -> Table:
+    return Table(id=code, name='', code=code, comment='', columns=(), keys=(), primary_key=None, indexes=())
+
+
+def schema(codes: List[str], edges: List[tuple]) -> Schema:
+    """
+    :param edges: (child, parent) table codes of the references
+    """
+    references = [Reference(id='{}_{}'.format(child, parent), code='fk_{}_{}'.format(child, parent), name='',
+                            parent_table=parent, child_table=child, parent_columns=(), child_columns=())
+                  for child, parent in edges]
+    return Schema('oracle', [table(code) for code in codes], (), references)
+
+
+def codes(tables: List[Table]) -> List[str]:
+    return [t.code for t in tables]
+
+
+class DependencyOrderTest(unittest.TestCase):
+    def test_parents_first(self):
+        s = schema(['a', 'b', 'c', 'd'], [('a', 'b'), ('b', 'c'), ('d', 'c')])
+        tables, cycle = s.sort_by_dependencies(list(s.tables))
+        self.assertEqual(['c', 'b', 'd', 'a'], codes(tables))
+        self.assertEqual([], cycle)
+
+    def test_cycle(self):
+        # x is independent, d depends on the cycle
+        s = schema(['a', 'b', 'c', 'd', 'x'], [('a', 'b'), ('b', 'c'), ('c', 'a'), ('d', 'a')])
+        tables, cycle = s.sort_by_dependencies(list(s.tables))
+        self.assertEqual(['x', 'a', 'b', 'c', 'd'], codes(tables))
+        self.assertEqual(['a', 'b', 'c', 'a'], cycle)
+
+    def test_cycle_from_dependent(self):
+        s = schema(['a', 'b', 'c', 'd'], [('a', 'b'), ('b', 'c'), ('c', 'b'), ('d', 'a')])
+        tables, cycle = s.sort_by_dependencies([s.get_table('d'), s.get_table('a'), s.get_table('b'),
+                                                s.get_table('c')])
+        self.assertEqual(['d', 'a', 'b', 'c'], codes(tables))
+        self.assertEqual(['b', 'c', 'b'], cycle)
+
+    def test_self_reference(self):
+        s = schema(['a', 'b'], [('a', 'a'), ('a', 'b')])
+        self.assertEqual(('b',), s.dependencies['a'])
+        tables, cycle = s.sort_by_dependencies(list(s.tables))
+        self.assertEqual(['b', 'a'], codes(tables))
+        self.assertEqual([], cycle)
+
+    def test_tables_not_given(self):
+        # b is not sorted, so neither a -> b nor the cycle through b matter
+        s = schema(['a', 'b', 'c'], [('a', 'b'), ('b', 'c'), ('c', 'b'), ('c', 'a')])
+        tables, cycle = s.sort_by_dependencies([s.get_table('c'), s.get_table('a')])
+        self.assertEqual(['a', 'c'], codes(tables))
+        self.assertEqual([], cycle)
+
+
+class RenderDDLTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = load(SAMPLE)
+
+    def test_by_code(self):
+        self.assertEqual(self.schema.render_ddl(self.schema.get_table('orders'), 'mysql'),
+                         self.schema.render_ddl('ORDERS', 'mysql'))
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            self.schema.render_ddl('nothing', 'mysql')
+        with self.assertRaises(ValueError):
+            self.schema.render_ddl('orders', 'sqlite')
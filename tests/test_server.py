@@ -0,0 +1,126 @@
+import datetime
+import http.client
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+
+from pdmreader.parser import PDMParser
+from pdmreader.server import create_server
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+class ServerTest(unittest.TestCase):
+    """
+    Requests to a server on a loopback port.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = create_server(PDMParser(SAMPLE).parse(), '127.0.0.1', 0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def request(self, path: str, method: str = 'GET', headers=None) -> http.client.HTTPResponse:
+        host, port = self.server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        self.addCleanup(connection.close)
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        response.body = response.read()
+        return response
+
+    def test_summary(self):
+        response = self.request('/')
+        self.assertEqual(200, response.status)
+        self.assertEqual({'db': 'oracle', 'tables': 3, 'sequences': 2}, json.loads(response.body))
+
+    def test_table(self):
+        response = self.request('/tables/ORDERS')
+        self.assertEqual(200, response.status)
+        self.assertEqual('application/json; charset=utf-8', response.getheader('Content-Type'))
+        table = json.loads(response.body)
+        self.assertEqual('orders', table['code'])
+        self.assertEqual(['id', 'customer_id', 'amount', 'created_at'], [c['code'] for c in table['columns']])
+        self.assertEqual('customer', table['references'][0]['parent_table'])
+
+    def test_not_modified(self):
+        response = self.request('/tables/orders')
+        etag = response.getheader('ETag')
+        self.assertTrue(etag)
+
+        response = self.request('/tables/orders', headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status)
+        self.assertEqual(b'', response.body)
+        self.assertEqual(etag, response.getheader('ETag'))
+
+        response = self.request('/tables/orders', headers={'If-None-Match': '"other"'})
+        self.assertEqual(200, response.status)
+
+    def test_ddl(self):
+        response = self.request('/tables/orders/ddl/oracle')
+        self.assertEqual(200, response.status)
+        self.assertIn('CREATE TABLE "orders"', response.body.decode('utf-8'))
+
+        response = self.request('/tables/orders/ddl/oracle', headers={'If-None-Match': response.getheader('ETag')})
+        self.assertEqual(304, response.status)
+
+    def test_java_etag_changes_with_date(self):
+        response = self.request('/tables/orders/ddl/java')
+        self.assertEqual(200, response.status)
+        etag = response.getheader('ETag')
+
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+
+        class Tomorrow(datetime.date):
+            @classmethod
+            def today(cls):
+                return tomorrow
+
+        with mock.patch('datetime.date', Tomorrow):
+            response = self.request('/tables/orders/ddl/java', headers={'If-None-Match': etag})
+        self.assertEqual(200, response.status)
+        self.assertNotEqual(etag, response.getheader('ETag'))
+        self.assertIn('@since ' + tomorrow.isoformat(), response.body.decode('utf-8'))
+
+    def test_not_found(self):
+        response = self.request('/tables/order')
+        self.assertEqual(404, response.status)
+        self.assertIn('orders', json.loads(response.body)['suggestions'])
+
+        self.assertEqual(404, self.request('/tables/orders/ddl/cobol').status)
+        self.assertEqual(404, self.request('/nothing').status)
+
+    def test_head(self):
+        get = self.request('/tables/customer')
+        head = self.request('/tables/customer', 'HEAD')
+        self.assertEqual(200, head.status)
+        self.assertEqual(b'', head.body)
+        self.assertEqual(get.getheader('Content-Length'), head.getheader('Content-Length'))
+        self.assertEqual(get.getheader('ETag'), head.getheader('ETag'))
+
+        self.assertEqual(404, self.request('/tables/nothing', 'HEAD').status)
+
+    def test_glob(self):
+        response = self.request('/tables?glob=order*')
+        self.assertEqual(200, response.status)
+        self.assertEqual(['order_line', 'orders'], [t['code'] for t in json.loads(response.body)])
+
+        all_tables = self.request('/tables')
+        self.assertEqual(['customer', 'order_line', 'orders'], [t['code'] for t in json.loads(all_tables.body)])
+        self.assertNotEqual(all_tables.getheader('ETag'), response.getheader('ETag'))
+
+        response = self.request('/sequences?glob=*orders')
+        self.assertEqual(['seq_orders'], json.loads(response.body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import dataclasses
+import os
+import shutil
+import tempfile
+import unittest
+
+from pdmreader import load, sidecar
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+class SidecarTest(unittest.TestCase):
+    """
+    Single tables loaded through the byte offset index must be the same as in the full parse.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'sample.pdm')
+        shutil.copyfile(SAMPLE, self.path)
+        self.expected = load(SAMPLE)
+
+    def test_load_table(self):
+        for expected in self.expected.tables:
+            with self.subTest(table=expected.code):
+                schema = sidecar.load_table(self.path, expected.code.upper())
+                self.assertEqual(self.expected.db, schema.db)
+                self.assertEqual([dataclasses.replace(expected, references=())], list(schema.tables))
+                self.assertEqual((), schema.sequences)
+        self.assertIsNone(sidecar.load_table(self.path, 'nothing'))
+        self.assertTrue(os.path.exists(sidecar.index_path(self.path)))
+
+    def test_read_index(self):
+        self.assertIsNone(sidecar.read_index(self.path))
+        index = sidecar.build_index(self.path)
+        self.assertEqual(['customer', 'order_line', 'orders'], sorted(index['tables']))
+        self.assertEqual(index, sidecar.read_index(self.path))
+
+    def test_stale_mtime(self):
+        sidecar.build_index(self.path)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertIsNone(sidecar.read_index(self.path))
+
+    def test_stale_size(self):
+        sidecar.build_index(self.path)
+        stat = os.stat(self.path)
+        with open(self.path, 'ab') as f:
+            f.write(b'\n')
+        # Same modification time, different size
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(sidecar.read_index(self.path))
+
+    def test_rebuilt(self):
+        sidecar.build_index(self.path)
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        # Moves every table, so the stale offsets would not parse
+        with open(self.path, 'wb') as f:
+            f.write(content.replace(b'<a:Name>Customer</a:Name>', b'<a:Name>Customers of the shop</a:Name>'))
+        os.utime(self.path, ns=(0, 0))
+        schema = sidecar.load_table(self.path, 'orders')
+        self.assertEqual([c.code for c in self.expected.get_table('orders').columns],
+                         [c.code for c in schema.get_table('orders').columns])
+        self.assertEqual('customers of the shop', sidecar.load_table(self.path, 'customer').tables[0].name)
@@ -0,0 +1,44 @@
+import os
+import pickle
+import unittest
+
+from pdmreader import load
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'models', 'sample.pdm')
+
+
+class TableStoreTest(unittest.TestCase):
+    """
+    A schema backed by a table store must be the same as one held in memory.
+    """
+
+    def setUp(self):
+        self.expected = load(SAMPLE)
+        # Small enough that tables get evicted
+        self.schema = load(SAMPLE, memory_limit=1)
+
+    def test_same_schema(self):
+        self.assertEqual(self.expected, self.schema)
+        self.assertEqual(hash(self.expected), hash(self.schema))
+        self.assertEqual(list(self.expected.tables), list(self.schema.tables))
+        self.assertEqual(self.expected.dependencies, self.schema.dependencies)
+        self.assertEqual(self.expected.table_names(), self.schema.table_names())
+
+    def test_lookup(self):
+        orders = self.schema.get_table('ORDERS')
+        self.assertEqual(self.expected.get_table('orders'), orders)
+        self.assertEqual(['fk_orders_customer'], [r.code for r in orders.references])
+        self.assertIsNone(self.schema.get_table('nothing'))
+        self.assertEqual(self.expected.find_tables('order*'), self.schema.find_tables('order*'))
+
+    def test_read_only(self):
+        with self.assertRaises(Exception):
+            self.schema.tables.add(self.expected.tables[0])
+
+    def test_pickle(self):
+        tables = pickle.loads(pickle.dumps(self.schema.tables))
+        self.assertEqual(list(self.expected.tables), list(tables))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from pdmreader.typemapping import EXACT, LOSSY, UNMAPPED, TypeMapping
+
+
+class Oracle2JavaTest(unittest.TestCase):
+    def convert(self, data_type: str):
+        return TypeMapping.convert_with_status('oracle', 'java', data_type)
+
+    def test_strings(self):
+        self.assertEqual(('String', EXACT), self.convert('varchar2(20)'))
+        for data_type in ['varchar2(20 byte)', 'nvarchar2(10)', 'char(1)', 'nchar(2)', 'char', 'clob', 'nclob']:
+            with self.subTest(data_type=data_type):
+                self.assertEqual(('String', EXACT), self.convert(data_type))
+
+    def test_numbers(self):
+        self.assertEqual(('Integer', EXACT), self.convert('number(9)'))
+        self.assertEqual(('Long', EXACT), self.convert('number(18)'))
+        self.assertEqual(('Double', LOSSY), self.convert('number(10,2)'))
+
+    def test_unmapped(self):
+        self.assertEqual(('String', UNMAPPED), self.convert('raw(16)'))